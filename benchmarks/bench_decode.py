@@ -0,0 +1,55 @@
+"""
+#! Transcript decoding benchmark - json.loads vs the streaming decoder
+#? Reports wall time and peak traced allocations for a 10 hour API response
+"""
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from synthetic import DURATIONS, make_transcript
+from services.transcript_stream import CHUNK_SIZE, TranscriptDecoder
+
+
+def _decode_whole(body: bytes):
+    return json.loads(body)["transcript"]
+
+
+def _decode_stream(body: bytes):
+    decoder = TranscriptDecoder()
+    for offset in range(0, len(body), CHUNK_SIZE):
+        decoder.feed(body[offset:offset + CHUNK_SIZE])
+    return decoder.close()
+
+
+def _measure(func, body: bytes) -> dict:
+    started = time.perf_counter()
+    func(body)
+    elapsed = time.perf_counter() - started
+    tracemalloc.start()  #? Separate pass, tracing slows the decode down
+    result = func(body)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del result
+    return {"seconds": round(elapsed, 4), "peak_kb": peak // 1024}
+
+
+def run(case: str = "10h") -> dict:
+    #! The response body itself is not counted, only what decoding allocates on top of it
+    body = json.dumps({"transcript": make_transcript(DURATIONS[case])}, ensure_ascii=False).encode("utf-8")
+    result = {
+        "case": case,
+        "body_kb": len(body) // 1024,
+        "json_loads": _measure(_decode_whole, body),
+        "streaming": _measure(_decode_stream, body),
+    }
+    print(f"decode {case}: json.loads {result['json_loads']['seconds']:.3f}s {result['json_loads']['peak_kb']} KiB, "
+          f"streaming {result['streaming']['seconds']:.3f}s {result['streaming']['peak_kb']} KiB", file=sys.stderr)
+    return result
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,75 @@
+"""
+#! create_pdf benchmark - wall time, peak RSS and output size per transcript length
+#? Each case runs in a freshly spawned process so peak RSS is not polluted by earlier cases
+"""
+import multiprocessing
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from synthetic import DURATIONS, make_transcript
+
+
+def _peak_rss_kb():
+    #? ru_maxrss is KiB on Linux and bytes on macOS, unavailable on Windows
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def _run_case(minutes: float, repeat: int, output_dir: str, result_queue, engine: str = "platypus"):
+    #! Child process body - renders the same transcript `repeat` times
+    from services.pdf_generate import create_pdf
+    from services import fonts
+
+    transcript = make_transcript(minutes)
+    fonts.warm_up()  #? Font registration is measured separately, not per render
+    baseline_rss = _peak_rss_kb()
+
+    timings = []
+    pdf_file = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        pdf_file = create_pdf(f"bench_{minutes}_{engine}", transcript, output_dir=output_dir,
+                              calback_func=lambda value, text: None, engine=engine,
+                              memoize=False)  #? Every repeat must really render
+        timings.append(time.perf_counter() - started)
+
+    result_queue.put({
+        "entries": len(transcript),
+        "wall_seconds_min": round(min(timings), 4),
+        "wall_seconds_median": round(statistics.median(timings), 4),
+        "baseline_rss_kb": baseline_rss,
+        "peak_rss_kb": _peak_rss_kb(),
+        "output_bytes": os.path.getsize(pdf_file),
+    })
+
+
+def run(cases=None, repeat: int = 3, engine: str = "platypus") -> list:
+    #! Runs every case with one PDF engine and returns one result dict per transcript length
+    ctx = multiprocessing.get_context("spawn")
+    results = []
+    with tempfile.TemporaryDirectory() as output_dir:
+        for name in cases or DURATIONS:
+            minutes = DURATIONS[name]
+            queue = ctx.Queue()
+            process = ctx.Process(target=_run_case, args=(minutes, repeat if minutes < 180 else 1, output_dir, queue, engine))
+            process.start()
+            result = queue.get()
+            process.join()
+            result = {"case": name, "minutes": minutes, **result}
+            print(f"create_pdf[{engine}] {name:>6}: {result['wall_seconds_min']:.3f}s  "
+                  f"peak {result['peak_rss_kb']} KiB  {result['output_bytes']} bytes", file=sys.stderr)
+            results.append(result)
+    return results
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,54 @@
+"""
+#! Cold start benchmark - import cost before the first window and of the background warm-up
+#? Every sample runs in a fresh interpreter started outside src/, like a relaunch of the app
+"""
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+#? name -> module imported in a fresh process
+#? first_window: everything main.py loads before it can show the window (flet included)
+#? flet: the UI framework alone, the floor first_window cannot go below
+#? warm_up: the pipeline (aiohttp) the app loads in the background after the first frame
+TARGETS = {
+    "first_window": "main",
+    "flet": "flet",
+    "warm_up": "services.pipeline",
+}
+
+_SCRIPT = (
+    "import sys, time\n"
+    "sys.path.insert(0, {src!r})\n"
+    "started = time.perf_counter()\n"
+    "import {module}\n"
+    "print(time.perf_counter() - started)\n"
+)
+
+
+def _sample(module: str) -> float:
+    script = _SCRIPT.format(src=os.path.abspath(SRC), module=module)
+    with tempfile.TemporaryDirectory() as cwd:  #? Nothing may depend on the working directory
+        output = subprocess.run([sys.executable, "-c", script], cwd=cwd, capture_output=True, text=True, check=True)
+    return float(output.stdout.strip().splitlines()[-1])
+
+
+def run(repeat: int = 5) -> dict:
+    #! Import seconds per target, min and median over `repeat` fresh processes
+    results = {}
+    for name, module in TARGETS.items():
+        samples = [_sample(module) for _ in range(repeat)]
+        results[name] = {
+            "module": module,
+            "seconds_min": round(min(samples), 4),
+            "seconds_median": round(statistics.median(samples), 4),
+        }
+        print(f"startup {name}: {min(samples):.3f}s min, {statistics.median(samples):.3f}s median", file=sys.stderr)
+    return results
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,36 @@
+"""
+#! extract_youtube_id throughput over a large mixed URL corpus
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from synthetic import make_url_corpus
+from services.youtube import extract_youtube_id
+
+
+def run(size: int = 200_000, repeat: int = 5) -> dict:
+    #! Returns best-of-`repeat` throughput in URLs per second
+    corpus = make_url_corpus(size)
+    best = None
+    matched = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        matched = sum(1 for url in corpus if extract_youtube_id(url) is not None)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+
+    result = {
+        "corpus_size": size,
+        "matched": matched,
+        "best_seconds": round(best, 4),
+        "urls_per_second": int(size / best),
+    }
+    print(f"extract_youtube_id: {result['urls_per_second']:,} URLs/s ({matched}/{size} matched)", file=sys.stderr)
+    return result
+
+
+if __name__ == "__main__":
+    run()
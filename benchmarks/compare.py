@@ -0,0 +1,78 @@
+"""
+#! Compares two benchmark result files
+#? Usage: python benchmarks/compare.py baseline.json candidate.json [--threshold 0.10]
+#? Exits with 1 when any timing got slower than the threshold allows.
+"""
+import argparse
+import json
+import sys
+
+
+def _ratio(old, new):
+    return (new / old) if old else None
+
+
+def compare(baseline: dict, candidate: dict, threshold: float) -> list:
+    #! Returns (name, old, new, ratio, regressed) rows for every shared metric
+    rows = []
+    for section in ("create_pdf", "create_pdf_canvas"):
+        old_cases = {case["case"]: case for case in baseline.get(section, [])}
+        for case in candidate.get(section, []):
+            old = old_cases.get(case["case"])
+            if not old:
+                continue
+            for metric, lower_is_better in (("wall_seconds_min", True), ("peak_rss_kb", True), ("output_bytes", True)):
+                ratio = _ratio(old.get(metric), case.get(metric))
+                if ratio is None:
+                    continue
+                rows.append((f"{section}[{case['case']}].{metric}", old[metric], case[metric], ratio,
+                             ratio > 1 + threshold if metric == "wall_seconds_min" else False))
+
+    old_urls, new_urls = baseline.get("extract_youtube_id"), candidate.get("extract_youtube_id")
+    if old_urls and new_urls:
+        ratio = _ratio(old_urls["urls_per_second"], new_urls["urls_per_second"])
+        rows.append(("extract_youtube_id.urls_per_second", old_urls["urls_per_second"], new_urls["urls_per_second"],
+                     ratio, ratio < 1 - threshold))
+
+    old_decode, new_decode = baseline.get("decode_transcript"), candidate.get("decode_transcript")
+    if old_decode and new_decode and old_decode["case"] == new_decode["case"]:
+        for metric in ("seconds", "peak_kb"):
+            old, new = old_decode["streaming"][metric], new_decode["streaming"][metric]
+            ratio = _ratio(old, new)
+            if ratio is not None:
+                rows.append((f"decode_transcript.streaming.{metric}", old, new, ratio,
+                             ratio > 1 + threshold if metric == "seconds" else False))
+
+    old_startup, new_startup = baseline.get("startup", {}), candidate.get("startup", {})
+    for name, case in new_startup.items():
+        old = old_startup.get(name)
+        if old:
+            ratio = _ratio(old["seconds_min"], case["seconds_min"])
+            if ratio is not None:
+                rows.append((f"startup.{name}.seconds_min", old["seconds_min"], case["seconds_min"], ratio,
+                             ratio > 1 + threshold))
+    return rows
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Compare two benchmark runs")
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown before failing (0.10 = 10%%)")
+    args = parser.parse_args(argv)
+
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    with open(args.candidate, encoding='utf-8') as f:
+        candidate = json.load(f)
+
+    regressions = 0
+    for name, old, new, ratio, regressed in compare(baseline, candidate, args.threshold):
+        regressions += regressed
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{name:<48} {old:>14} -> {new:>14}  x{ratio:.2f}{flag}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
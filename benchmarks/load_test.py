@@ -0,0 +1,149 @@
+"""
+#! End-to-end load test of the headless pipeline against the local stub server
+#? Converts N synthetic videos (fetch + PDF render) with the same client, render pool and
+#? convert_video() the app and the CLI use, then reports throughput and tail latency.
+#? Usage: python benchmarks/load_test.py [--videos 200] [--jobs 8] [--error-rate 0.05 --burst-every 10]
+#? Without --url a stub server is started in a background thread with the stub options given here.
+"""
+import argparse
+import asyncio
+import collections
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from stub_server import StubServer, add_arguments
+from services.metrics import MetricsWriter
+from services.pdf_generate import ENGINES
+from services.pdf_pool import PdfRenderPool
+from services.pipeline import convert_video
+from services.settings_manager import SettingsManager
+from services.transcript import TranscriptClient
+
+
+def percentile(values: list, q: float):
+    #? Nearest-rank percentile, None for an empty list
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, min(len(ordered) - 1, round(q / 100 * len(ordered)) - 1))]
+
+
+def _summary(values: list) -> dict:
+    return {
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "max": max(values) if values else None,
+    }
+
+
+class _StubThread:
+    #? Runs the stub on its own event loop, so its sleeps and writes do not share the client's loop
+    def __init__(self, options):
+        self.server = StubServer(options)
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+
+    def __enter__(self) -> StubServer:
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self.server.start(), self._loop).result()
+        return self.server
+
+    def __exit__(self, *exc):
+        asyncio.run_coroutine_threadsafe(self.server.stop(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+
+async def run(url: str, videos: int, jobs: int, pdf_workers: int, engine: str, requests_per_second: float,
+              max_retries: int, work_dir: str) -> dict:
+    #! Converts `videos` synthetic IDs with at most `jobs` in flight and returns the report
+    setting = SettingsManager(os.path.join(work_dir, "settings.json"), save_delay=0)
+    setting.set_api_key("load-test")
+    setting.set_download_path(os.path.join(work_dir, "pdf"))
+    os.makedirs(setting.get_download_path(), exist_ok=True)
+    metrics_path = os.path.join(work_dir, "metrics.jsonl")
+    metrics_writer = MetricsWriter(metrics_path)
+
+    client = TranscriptClient(limit_per_host=jobs, requests_per_second=requests_per_second,
+                              max_retries=max_retries, backoff_max=10.0, url=url)
+    renderer = PdfRenderPool(workers=pdf_workers)
+    slots = asyncio.Semaphore(jobs)
+
+    async def convert(video_id: str):
+        async with slots:
+            try:
+                await convert_video(video_id, setting, client, renderer, use_cache=False,
+                                    metrics_writer=metrics_writer, engine=engine)
+            except Exception:
+                pass  #? Recorded by the metrics writer
+
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(convert(f"load{i:07d}") for i in range(videos)))
+    finally:
+        await client.close()
+        renderer.shutdown()
+    wall = time.perf_counter() - started
+
+    with open(metrics_path, encoding='utf-8') as f:
+        records = [json.loads(line) for line in f]
+    done = [record for record in records if record["status"] == "done"]
+    return {
+        "videos": videos,
+        "jobs": jobs,
+        "pdf_workers": pdf_workers,
+        "engine": engine,
+        "done": len(done),
+        "failed": len(records) - len(done),
+        "errors": dict(collections.Counter(record.get("error") for record in records if record["status"] != "done")),
+        "retried": sum(1 for record in records if record.get("api_attempts", 1) > 1),
+        "wall_seconds": round(wall, 3),
+        "videos_per_second": round(len(done) / wall, 3) if wall else None,
+        "latency_seconds": _summary([record["total_seconds"] for record in done]),
+        "fetch_seconds": _summary([record["fetch_seconds"] for record in done if "fetch_seconds" in record]),
+        "render_seconds": _summary([record["render_seconds"] for record in done if "render_seconds" in record]),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Load test of the conversion pipeline against a stub API")
+    parser.add_argument("--url", help="endpoint of an already running stub (default: start one)")
+    parser.add_argument("--videos", type=int, default=200)
+    parser.add_argument("--jobs", type=int, default=8, help="videos in flight, like --jobs of the CLI")
+    parser.add_argument("--pdf-workers", type=int, default=2)
+    parser.add_argument("--engine", choices=ENGINES, default="platypus")
+    parser.add_argument("--rps", type=float, default=0, help="client request rate limit (0 = unlimited)")
+    parser.add_argument("--max-retries", type=int, default=4)
+    parser.add_argument("--output", help="also write the report to this JSON file")
+    add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="transcriptor-load-") as work_dir:
+        def load(url: str) -> dict:
+            return asyncio.run(run(url, args.videos, args.jobs, args.pdf_workers, args.engine, args.rps,
+                                   args.max_retries, work_dir))
+
+        if args.url:
+            report = load(args.url)
+        else:
+            with _StubThread(args) as server:
+                report = load(server.url)
+                report["stub"] = dict(server.stats)
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + "\n")
+    return 1 if report["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
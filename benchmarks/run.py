@@ -0,0 +1,69 @@
+"""
+#! Runs the benchmark suite and writes the results to JSON
+#? Usage: python benchmarks/run.py [--output results.json] [--cases 1min 1h] [--quick]
+#? Compare two runs with: python benchmarks/compare.py old.json new.json
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+
+import bench_decode
+import bench_pdf
+import bench_startup
+import bench_urls
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def _git_commit():
+    #? Commit the numbers belong to, if the tree is a git checkout
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Transcriptor benchmark suite")
+    parser.add_argument("--output", help="results file (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--cases", nargs="+", choices=list(bench_pdf.DURATIONS), help="transcript lengths to render")
+    parser.add_argument("--repeat", type=int, default=3, help="renders per case (long cases run once)")
+    parser.add_argument("--quick", action="store_true", help="only the short cases, for a fast sanity check")
+    args = parser.parse_args(argv)
+
+    import reportlab
+    cases = args.cases or (["1min", "10min", "1h"] if args.quick else None)
+    results = {
+        "meta": {
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "reportlab": reportlab.Version,
+        },
+        "create_pdf": bench_pdf.run(cases, repeat=args.repeat),
+        "create_pdf_canvas": bench_pdf.run(cases, repeat=args.repeat, engine="canvas"),
+        "extract_youtube_id": bench_urls.run(),
+        "decode_transcript": bench_decode.run("1h" if args.quick else "10h"),
+        "startup": bench_startup.run(repeat=3 if args.quick else 5),
+    }
+
+    output = args.output
+    if not output:
+        os.makedirs(os.path.join(HERE, "results"), exist_ok=True)
+        stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+        output = os.path.join(HERE, "results", f"{stamp}.json")
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"results written to {output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
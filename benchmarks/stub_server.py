@@ -0,0 +1,178 @@
+"""
+#! Local stand-in for the TranscriptAPI endpoint, for load and fault testing
+#? Serves synthetic transcripts with a configurable size, latency distribution,
+#? error rate, 429 bursts and slow-drip bodies.
+#? Usage: python benchmarks/stub_server.py [--port 8765] [--minutes 1-60] [--latency 0.2 --latency-dist lognormal]
+#? Point the app at it with "api_url": "http://127.0.0.1:8765/api/v2/youtube/transcript" in settings.json.
+"""
+import argparse
+import asyncio
+import collections
+import functools
+import json
+import math
+import random
+import socket
+import sys
+import time
+import zlib
+
+from aiohttp import web
+
+from synthetic import make_transcript
+
+PATH = "/api/v2/youtube/transcript"
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "exponential", "lognormal")
+ERROR_STATUSES = (500, 502, 503)
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    #! Stub behaviour options, shared with the load test so it can start its own stub
+    parser.add_argument("--minutes", default="10", help="transcript length in minutes, or a MIN-MAX range per video")
+    parser.add_argument("--latency", type=float, default=0.05, help="mean seconds before the response starts")
+    parser.add_argument("--latency-dist", choices=LATENCY_DISTRIBUTIONS, default="exponential")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with a 5xx")
+    parser.add_argument("--burst-every", type=float, default=0.0, help="seconds between 429 bursts (0 = none)")
+    parser.add_argument("--burst-length", type=float, default=1.0, help="seconds every request is rate limited")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After sent with the 429s")
+    parser.add_argument("--drip-rate", type=float, default=0.0, help="share of bodies sent slowly")
+    parser.add_argument("--drip-chunk", type=int, default=4096, help="bytes per slow-drip write")
+    parser.add_argument("--drip-delay", type=float, default=0.01, help="seconds between slow-drip writes")
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def _parse_minutes(value: str) -> tuple:
+    low, _, high = str(value).partition("-")
+    return float(low), float(high or low)
+
+
+@functools.lru_cache(maxsize=256)
+def _body(video_id: str, low: float, high: float) -> bytes:
+    #? Same video, same transcript - the length is drawn from the range with the ID as seed
+    seed = zlib.crc32(video_id.encode())
+    minutes = low + (high - low) * random.Random(seed).random()
+    return json.dumps({"video_id": video_id, "transcript": make_transcript(minutes, seed)}).encode()
+
+
+class StubServer:
+    """
+    #! aiohttp server answering like TranscriptAPI
+    #? The transcript of a video ID is always the same (seeded from the ID), its length
+    #? is picked from the `minutes` range. Outcomes are counted in `stats`.
+    """
+
+    def __init__(self, options, host: str = "127.0.0.1", port: int = 0):
+        self.options = options
+        self.host = host
+        self.port = port  #? 0 picks a free port, the bound one is stored on start()
+        self.minutes = _parse_minutes(options.minutes)
+        self.stats = collections.Counter()
+        self._rng = random.Random(options.seed)
+        self._started = time.monotonic()
+        self._runner = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}{PATH}"
+
+    def _latency(self) -> float:
+        mean = self.options.latency
+        dist = self.options.latency_dist
+        if mean <= 0 or dist == "fixed":
+            return max(0.0, mean)
+        if dist == "uniform":
+            return self._rng.uniform(0, 2 * mean)
+        if dist == "exponential":
+            return self._rng.expovariate(1 / mean)
+        #? Heavy tail with the requested mean (sigma 1)
+        return self._rng.lognormvariate(math.log(mean) - 0.5, 1.0)
+
+    def _in_burst(self) -> bool:
+        every = self.options.burst_every
+        return every > 0 and (time.monotonic() - self._started) % every < self.options.burst_length
+
+    async def handle(self, request: web.Request) -> web.StreamResponse:
+        self.stats["requests"] += 1
+        if not request.headers.get("Authorization", "").removeprefix("Bearer ").strip():
+            self.stats["401"] += 1
+            return web.json_response({"detail": "Missing API key"}, status=401)
+        video_id = request.query.get("video_url")
+        if not video_id:
+            self.stats["400"] += 1
+            return web.json_response({"detail": "video_url is required"}, status=400)
+
+        await asyncio.sleep(self._latency())
+        if self._in_burst():
+            self.stats["429"] += 1
+            return web.json_response({"detail": "Too many requests"}, status=429,
+                                     headers={"Retry-After": f"{self.options.retry_after:g}"})
+        if self._rng.random() < self.options.error_rate:
+            status = self._rng.choice(ERROR_STATUSES)
+            self.stats[str(status)] += 1
+            return web.json_response({"detail": "Stub failure"}, status=status)
+
+        body = _body(video_id, *self.minutes)
+        self.stats["200"] += 1
+        self.stats["bytes"] += len(body)
+        if self._rng.random() >= self.options.drip_rate:
+            return web.Response(body=body, content_type="application/json")
+
+        #? Slow drip: the body trickles out in small writes
+        self.stats["dripped"] += 1
+        response = web.StreamResponse(headers={"Content-Type": "application/json"})
+        response.content_length = len(body)
+        await response.prepare(request)
+        chunk = max(1, self.options.drip_chunk)
+        for offset in range(0, len(body), chunk):
+            await response.write(body[offset:offset + chunk])
+            await asyncio.sleep(self.options.drip_delay)
+        await response.write_eof()
+        return response
+
+    async def handle_stats(self, request: web.Request) -> web.Response:
+        return web.json_response(dict(self.stats))
+
+    async def start(self):
+        #! Binds the socket and starts serving on the running loop
+        app = web.Application()
+        app.router.add_get(PATH, self.handle)
+        app.router.add_get("/stats", self.handle_stats)
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.host, self.port))
+        self.port = sock.getsockname()[1]
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.SockSite(self._runner, sock).start()
+        self._started = time.monotonic()
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+async def _serve(server: StubServer):
+    await server.start()
+    print(f"Serving synthetic transcripts on {server.url} (stats at /stats)", flush=True)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Local TranscriptAPI stub server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    add_arguments(parser)
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(_serve(StubServer(args, args.host, args.port)))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
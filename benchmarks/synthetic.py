@@ -0,0 +1,68 @@
+"""
+#! Synthetic inputs for the benchmarks
+#? Transcripts follow the TranscriptAPI shape ([{"text", "start", "duration"}, ...]),
+#? URL corpora mix every supported YouTube format with noise.
+"""
+import random
+import string
+
+#? Average speaking pace used to size transcripts
+WORDS_PER_MINUTE = 150
+WORDS_PER_ENTRY = 8
+
+VOCABULARY = (
+    "the of and to a in that is was he for it with as his on be at by i this had not are but from "
+    "or have an they which one you were her all she there would their we him been has when who will "
+    "more no if out so said what up its about into than them can only other new some could time these "
+    "two may then do first any my now such like our over man me even most made after also did many "
+    "video transcript lecture people really actually going think know right okay little bit thing"
+).split()
+
+#? Named durations used by the suite, in minutes
+DURATIONS = {
+    "1min": 1,
+    "10min": 10,
+    "1h": 60,
+    "3h": 180,
+    "10h": 600,
+}
+
+
+def make_transcript(minutes: float, seed: int = 0) -> list:
+    #! Builds a deterministic transcript of roughly `minutes` of speech
+    rng = random.Random(seed)
+    entries = []
+    total_words = int(minutes * WORDS_PER_MINUTE)
+    seconds_per_word = 60.0 / WORDS_PER_MINUTE
+    start = 0.0
+    for _ in range(max(1, total_words // WORDS_PER_ENTRY)):
+        words = rng.choices(VOCABULARY, k=WORDS_PER_ENTRY)
+        text = " ".join(words)
+        if rng.random() < 0.3:  #? Roughly every third caption closes a sentence
+            text += rng.choice(".?!")
+        duration = round(WORDS_PER_ENTRY * seconds_per_word * rng.uniform(0.8, 1.2), 2)
+        entries.append({"text": text, "start": round(start, 2), "duration": duration})
+        start += duration
+    return entries
+
+
+def _video_id(rng: random.Random) -> str:
+    return "".join(rng.choices(string.ascii_letters + string.digits + "_-", k=11))
+
+
+def make_url_corpus(size: int, seed: int = 0) -> list:
+    #! Mixed corpus of valid URLs in every supported format plus invalid strings
+    rng = random.Random(seed)
+    templates = [
+        "https://www.youtube.com/watch?v={id}",
+        "https://youtube.com/watch?v={id}&t=42s",
+        "https://youtu.be/{id}",
+        "https://youtu.be/{id}?si=AbCdEfGh",
+        "https://www.youtube.com/embed/{id}",
+        "https://www.youtube.com/v/{id}",
+        "https://www.youtube.com/shorts/{id}",  #? Not supported, must return None
+        "https://example.com/watch?v={id}",
+        "not a url at all",
+        "https://www.youtube.com/watch?v=short",
+    ]
+    return [rng.choice(templates).format(id=_video_id(rng)) for _ in range(size)]
@@ -0,0 +1,244 @@
+"""
+#! Headless batch converter - runs the transcript -> PDF pipeline without the Flet UI
+#? Usage: python cli.py batch urls.txt --out DIR --jobs 8
+#?        python cli.py search "some words" [--pdf matches.pdf]
+#? batch prints one JSON result per URL to stdout (or --summary FILE), search one JSON line per match.
+#? Exit codes: 0 all converted or skipped / matches found, 1 some URLs failed / no match, 2 usage or configuration error.
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import sys
+import time
+from services.settings_manager import SettingsManager
+from services.pdf_pool import PdfRenderPool
+from services.transcript import TranscriptError
+from services.pipeline import (convert_video, convert_digest, convert_search, create_client, create_metrics_writer,
+                               create_search_index, search_index_path)
+from services.search_index import SearchIndex, format_ms
+from services.youtube import extract_youtube_id
+from services.journal import QueueJournal, QUEUED, DONE, FAILED
+from services.pdf_generate import ENGINES
+from services.app_paths import SETTINGS_FILE  #? Settings file shared with the desktop app
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+
+
+def read_urls(path: str) -> list:
+    #? One URL per line, blank lines and # comments are skipped ('-' reads stdin)
+    f = sys.stdin if path == "-" else open(path, 'r', encoding='utf-8')
+    try:
+        return [line.strip() for line in f if line.strip() and not line.strip().startswith("#")]
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+async def run_batch(urls: list, setting: SettingsManager, output_dir: str, jobs: int, pdf_workers: int,
+                    use_cache: bool, summary, metrics_path: str | None = None, journal_path: str | None = None,
+                    engine: str | None = None, memoize: bool | None = None) -> tuple:
+    #! Converts all URLs with at most `jobs` in flight, returns (failures, skipped)
+    #? With a journal, videos finished by an earlier (interrupted) run are skipped, which is not a failure
+    index = create_search_index(setting)
+    client = create_client(setting, index)
+    metrics_writer = create_metrics_writer(setting, metrics_path)
+    renderer = PdfRenderPool(workers=pdf_workers)
+    slots = asyncio.Semaphore(jobs)
+    failures = 0
+    skipped = 0
+
+    journal = None
+    if journal_path:
+        journal = QueueJournal(journal_path, keep_done=True)
+        journal.replay()
+
+    async def convert(url: str):
+        nonlocal failures, skipped
+        result = {"url": url, "video_id": extract_youtube_id(url), "status": "ok", "pdf": None, "error": None}
+        started = time.perf_counter()
+        video_id = result["video_id"]
+        if video_id is None:
+            result["status"] = "invalid"
+            result["error"] = "Invalid YouTube URL"
+        elif journal and journal.state_of(video_id) == DONE:
+            result["status"] = "skipped"  #? Already converted by an earlier run
+            result["pdf"] = journal.tasks[video_id].get("pdf")
+        else:
+            def on_stage(state: str):
+                if journal:
+                    journal.record(video_id, state, video_id=video_id)
+
+            on_stage(QUEUED)
+            async with slots:
+                try:
+                    result["pdf"] = await convert_video(video_id, setting, client, renderer,
+                                                        output_dir=output_dir, use_cache=use_cache,
+                                                        metrics_writer=metrics_writer, on_stage=on_stage,
+                                                        engine=engine, memoize=memoize)
+                    if journal:
+                        journal.record(video_id, DONE, video_id=video_id, pdf=result["pdf"])
+                except TranscriptError as e:
+                    result["status"] = "failed"
+                    result["error"] = str(e)
+                    result["retryable"] = e.retryable  #? A later run may still succeed
+                except Exception as e:
+                    result["status"] = "failed"
+                    result["error"] = str(e) or type(e).__name__
+                if journal and result["status"] == "failed":
+                    journal.record(video_id, FAILED, video_id=video_id, error=result["error"])
+        result["seconds"] = round(time.perf_counter() - started, 3)
+        if result["status"] == "skipped":
+            skipped += 1
+        elif result["status"] != "ok":
+            failures += 1
+        summary.write(json.dumps(result, ensure_ascii=False) + "\n")
+        summary.flush()
+
+    try:
+        await asyncio.gather(*(convert(url) for url in urls))
+    finally:
+        await client.close()
+        renderer.shutdown()
+        if index:
+            index.close()
+    return failures, skipped
+
+
+async def run_digest(urls: list, setting: SettingsManager, output_path: str, jobs: int, use_cache: bool, summary,
+                     metrics_path: str | None = None) -> int:
+    #! Converts all URLs into a single PDF, returns the number of failures
+    index = create_search_index(setting)
+    client = create_client(setting, index)
+    metrics_writer = create_metrics_writer(setting, metrics_path)
+    video_ids = [extract_youtube_id(url) for url in urls]
+    started = time.perf_counter()
+    try:
+        try:
+            errors = await convert_digest([video_id for video_id in video_ids if video_id], setting, client, output_path,
+                                          title=os.path.splitext(os.path.basename(output_path))[0],
+                                          jobs=jobs, use_cache=use_cache, metrics_writer=metrics_writer)
+        except ValueError as e:
+            errors = {video_id: str(e) for video_id in video_ids if video_id}
+    finally:
+        await client.close()
+        if index:
+            index.close()
+
+    failures = 0
+    seconds = round(time.perf_counter() - started, 3)
+    for url, video_id in zip(urls, video_ids):
+        result = {"url": url, "video_id": video_id, "status": "ok", "pdf": output_path, "error": None, "seconds": seconds}
+        if video_id is None:
+            result.update(status="invalid", pdf=None, error="Invalid YouTube URL")
+        elif errors.get(video_id):
+            result.update(status="failed", pdf=None, error=errors[video_id])
+        if result["status"] != "ok":
+            failures += 1
+        summary.write(json.dumps(result, ensure_ascii=False) + "\n")
+    summary.flush()
+    return failures
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="transcriptor", description="YouTube transcript to PDF converter (headless)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    batch = commands.add_parser("batch", help="convert every URL listed in a file")
+    batch.add_argument("urls", help="text file with one YouTube URL per line ('-' for stdin)")
+    batch.add_argument("--out", help="output folder (default: download folder from settings)")
+    batch.add_argument("--jobs", type=int, help="videos converted at the same time (default: max_concurrent_tasks)")
+    batch.add_argument("--pdf-workers", type=int, help="PDF worker processes (default: pdf_workers setting)")
+    batch.add_argument("--settings", default=SETTINGS_FILE, help="settings file to use (shared with the desktop app)")
+    batch.add_argument("--summary", help="write JSON lines results to this file instead of stdout")
+    batch.add_argument("--no-cache", action="store_true", help="always call the API, ignore the transcript cache")
+    batch.add_argument("--metrics", help="append per-task stage timings (JSONL) to this file")
+    batch.add_argument("--journal", help="resume journal, videos finished in an earlier run are skipped")
+    batch.add_argument("--engine", choices=ENGINES, help="PDF renderer (default: pdf_engine setting)")
+    batch.add_argument("--force", action="store_true", help="render every PDF again, even if it is unchanged")
+    batch.add_argument("--digest", metavar="NAME.pdf", help="render every video into this one PDF (relative to --out)")
+
+    search = commands.add_parser("search", help="search the transcripts of every converted video")
+    search.add_argument("query", help="words that must all appear in a segment (word* matches a prefix)")
+    search.add_argument("--limit", type=int, default=50, help="maximum number of matches (default: 50)")
+    search.add_argument("--video", help="only search this video ID")
+    search.add_argument("--pdf", metavar="FILE.pdf", help="also render the matching segments into this PDF")
+    search.add_argument("--context", type=int, default=1, help="segments kept before and after each match in the PDF")
+    search.add_argument("--index", help="search index database (default: the one shared with the desktop app)")
+    return parser
+
+
+def run_search(args) -> int:
+    #! Prints the matching segments as JSON lines and optionally renders them to a PDF, no API call
+    path = args.index or search_index_path()
+    if not os.path.exists(path):
+        print("error: no search index yet, convert some videos first", file=sys.stderr)
+        return EXIT_USAGE
+
+    index = SearchIndex(path)
+    try:
+        hits = index.search(args.query, limit=max(1, args.limit), video_id=args.video)
+        for hit in hits:
+            print(json.dumps({"video_id": hit.video_id, "start_ms": hit.start_ms, "timestamp": format_ms(hit.start_ms),
+                              "text": hit.text, "snippet": hit.snippet}, ensure_ascii=False))
+        if args.pdf and hits:
+            pdf_file = asyncio.run(convert_search(index, hits, args.pdf, title=args.query, context=max(0, args.context)))
+            print(f"matches written to {pdf_file}", file=sys.stderr)
+    finally:
+        index.close()
+
+    print(f"{len(hits)} matches", file=sys.stderr)
+    return EXIT_OK if hits else EXIT_FAILED
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.command == "search":
+        return run_search(args)
+    setting = SettingsManager(args.settings)
+
+    if not setting.get_api_key():
+        print("error: API key is not configured in settings", file=sys.stderr)
+        return EXIT_USAGE
+
+    output_dir = args.out or setting.get_download_path()
+    if not output_dir:
+        print("error: no output folder (use --out or set download_path)", file=sys.stderr)
+        return EXIT_USAGE
+    os.makedirs(output_dir, exist_ok=True)
+
+    try:
+        urls = read_urls(args.urls)
+    except OSError as e:
+        print(f"error: cannot read {args.urls}: {e}", file=sys.stderr)
+        return EXIT_USAGE
+
+    jobs = max(1, args.jobs or setting.get_max_concurrent_tasks())
+    pdf_workers = setting.get_pdf_workers() if args.pdf_workers is None else max(0, args.pdf_workers)
+    use_cache = setting.get_transcript_cache_enabled() and not args.no_cache
+
+    summary = open(args.summary, 'w', encoding='utf-8') if args.summary else sys.stdout
+    skipped = 0
+    try:
+        if args.digest:
+            failures = asyncio.run(run_digest(urls, setting, os.path.join(output_dir, args.digest), jobs, use_cache,
+                                              summary, args.metrics))
+        else:
+            failures, skipped = asyncio.run(run_batch(urls, setting, output_dir, jobs, pdf_workers, use_cache, summary,
+                                             args.metrics, args.journal, args.engine,
+                                             False if args.force else None))
+    finally:
+        if summary is not sys.stdout:
+            summary.close()
+
+    print(f"{len(urls) - failures - skipped}/{len(urls)} converted" + (f", {skipped} skipped" if skipped else ""),
+          file=sys.stderr)
+    return EXIT_FAILED if failures else EXIT_OK
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -1,85 +1,442 @@
 import asyncio
+import importlib
+import multiprocessing
+import os
+import threading
+import time
 import flet as ft
-import re
-from services.transcript import get_transcript 
-from services.pdf_generate import create_pdf
+from services.journal import QueueJournal, QUEUED
+from services.task_queue import (TaskQueue, TaskRecord, RUNNING, DONE, FAILED, REMOVED,
+                                 PRIORITY_HIGH, PRIORITY_NORMAL, PRIORITY_LOW)
+from services.app_paths import app_data_dir, SETTINGS_FILE
+from services.youtube import extract_youtube_id, extract_youtube_ids, read_youtube_ids, IMPORT_EXTENSIONS
 from services.settings_manager import SettingsManager
 
 
+class UpdateScheduler:
+    #! Coalesces control updates and sends them to the client in batches
+    def __init__(self, page: ft.Page, rate_hz: float = 15):
+        self.page = page
+        self.interval = 1 / rate_hz  #? Minimum time between two flushes
+        self._dirty = {}  #? id -> control, a control marked twice is sent once with its latest state
+        self._scheduled = False
+        self._lock = threading.Lock()  #? Sync Flet handlers run on worker threads
+    
+    def mark(self, control: ft.Control):
+        #? Marks a control as changed, the next flush sends its current state
+        with self._lock:
+            self._dirty[id(control)] = control
+            if self._scheduled:
+                return
+            self._scheduled = True
+        self.page.run_task(self._flush_later)
+    
+    async def _flush_later(self):
+        #! Waits one frame, then sends every dirty control in a single page update
+        await asyncio.sleep(self.interval)
+        with self._lock:
+            controls = list(self._dirty.values())
+            self._dirty.clear()
+            self._scheduled = False
+        controls = [control for control in controls if control.page is not None]  #? Skip removed cards
+        if controls:
+            self.page.update(*controls)
+
+
+class AppServices:
+    """
+    #! Transcript client, PDF worker pool, search index and metrics writer, loaded after the first frame
+    #? aiohttp and the pipeline are imported in a background thread so the window shows
+    #? without waiting for them. Tasks await `ready` before they use any service.
+    """
+
+    def __init__(self, setting: SettingsManager):
+        self.settings = setting
+        self.client = None  #? Shared transcript client used by every task
+        self.renderer = None  #? Shared PDF worker pool used by every task
+        self.metrics_writer = None  #? Per-task stage timings (None when disabled)
+        self.index = None  #? Full-text index of fetched transcripts (None when disabled)
+        self.ready = asyncio.Event()
+        self.error = None  #? Why loading failed, shown on every task
+        self._closed = False
+
+    async def load(self):
+        #! Imports the pipeline off the UI path, then warms the HTTP session, font and PDF workers
+        try:
+            pipeline = await asyncio.to_thread(importlib.import_module, "services.pipeline")
+            from services.pdf_pool import PdfRenderPool
+            if self._closed:
+                return
+            self.index = pipeline.create_search_index(self.settings)
+            self.client = pipeline.create_client(self.settings, self.index)  #! One pooled HTTP client for the whole app lifetime
+            self.renderer = PdfRenderPool(workers=self.settings.get_pdf_workers())  #! PDF rendering runs in worker processes
+            self.metrics_writer = pipeline.create_metrics_writer(self.settings)
+        except Exception as e:
+            self.error = str(e) or type(e).__name__
+            return
+        finally:
+            self.ready.set()  #? Waiting tasks go on either way
+        await self.client.warm_up()
+        await asyncio.to_thread(self.renderer.warm_up)
+
+    async def close(self):
+        #! Releases the HTTP session and the PDF worker processes
+        self._closed = True
+        if self.client is not None:
+            await self.client.close()
+        if self.renderer is not None:
+            self.renderer.shutdown()
+        if self.index is not None:
+            self.index.close()
+
+
+#? Priority names and icon colours of the task cards
+PRIORITY_LABELS = {PRIORITY_HIGH: "High", PRIORITY_NORMAL: "Normal", PRIORITY_LOW: "Low"}
+PRIORITY_COLORS = {PRIORITY_HIGH: ft.Colors.ORANGE, PRIORITY_NORMAL: ft.Colors.BLUE, PRIORITY_LOW: ft.Colors.GREY}
+
+#? Task cards have a fixed height so the list can place them without building them
+CARD_HEIGHT = 120
+CARD_SPACING = 10
+ITEM_EXTENT = CARD_HEIGHT + CARD_SPACING
+OVERSCAN = 4  #? Cards built above and below the visible part of the list
+DEFAULT_VIEWPORT = 400  #? List height assumed until the first scroll event reports it
+
+
 class VideoQueue(ft.Container):
     #! Queue class that manages video tasks
-    def __init__(self):
+    #? Task state and execution order live in a TaskQueue model, the list only
+    #? builds cards for the tasks that are on screen.
+    def __init__(self, setting: SettingsManager, services: AppServices, scheduler: UpdateScheduler,
+                 journal: QueueJournal | None = None):
         super().__init__(bgcolor="#2a2a2a",padding=8,border_radius=8)
-        self.tasks = []  #? List of all tasks
-        self.current_task_index = 0  #? Index of currently running task
+        self.settings = setting
+        self.services = services  #? Client, PDF pool and metrics shared by every task
+        self.scheduler = scheduler  #? Batches UI updates of the queue and its cards
+        self.journal = journal  #? Crash-safe record of task states (None disables resume)
+        self.model = TaskQueue(
+            size_hint=self._size_hint,
+            shortest_first=setting.get_queue_shortest_first(),
+            archive_after=setting.get_queue_archive_after(),
+        )
+        self.running_tasks = set()  #? Tasks that currently hold a concurrency slot
+        #! Sync Flet handlers (add, cancel, priority, drag and drop) run on worker threads while
+        #! finishing tasks refill the slots on the event loop - every queue change holds this lock
+        self.lock = threading.RLock()
         self.is_started = False  #? Checks whether the queue has been started
-        self.task_column = ft.Column(spacing=10,scroll=ft.ScrollMode.ALWAYS)  #? Column where tasks will be placed visually
+        self.task_list = TaskListView(self)  #? Virtualized list of task cards
+        self.archive_text = ft.Text(size=12, color=ft.Colors.WHITE54, visible=False)  #? Archived task counts
 
-        self.content = self.task_column
-
-    def add_task(self, setting, title: str = ""):  #! Parameters order corrected
-        #? Creates a new video task and adds it to the queue
-        task = VideoTask(title=title, queue=self, setting=setting)
-        self.tasks.insert(0, task)  #? New task is added to the beginning of the list
-        self.task_column.controls = self.tasks  #? Also added to the beginning in UI
+        self.content = ft.Column([self.task_list, self.archive_text], spacing=6)
         self.expend_controle()
-        self.update()
+
+    @property
+    def tasks(self) -> list:
+        return self.model.tasks
+
+    def add_task(self, title: str, task_id: str | None = None):
+        #? Adds one video to the queue (task_id is given when restoring from the journal)
+        self.add_tasks([title], [task_id] if task_id else None)
+    
+    def add_tasks(self, video_ids: list, task_ids: list | None = None) -> int:
+        #! Adds many videos at once (bulk import, journal restore) with one journal write and one UI update
+        #? Videos already waiting or converting are skipped, returns the number of tasks added
+        with self.lock:
+            added, duplicates = self.model.add(video_ids, task_ids)
+            if self.journal:
+                for task_id, video_id in duplicates:
+                    self.journal.record(task_id, REMOVED, video_id=video_id)  #? Duplicate restored record
+                if not task_ids and added:
+                    self.journal.record_many(QUEUED, ((record.task_id, {"video_id": record.video_id}) for record in added))
+            if not added:
+                return 0
+
+            self.refresh()
+            if self.is_started:  #? A running queue picks up new tasks as soon as a slot is free
+                self.fill_slots()
+            return len(added)
+    
+    def _size_hint(self, video_id: str) -> int | None:
+        #? Cached transcript size, the only one known before fetching (none until the services are loaded)
+        cache = getattr(self.services.client, "cache", None)
+        return cache.size_hint(video_id) if cache is not None else None
+    
+    def find_active(self, video_id: str):
+        #? Returns the waiting or running task for a video ID, if any
+        return self.model.find_active(video_id)
+    
+    def refresh(self):
+        #? Re-lays out the list after tasks were added, moved, removed or archived
+        with self.lock:
+            self.expend_controle()
+            archived = self.model.archived
+            self.archive_text.visible = bool(archived)
+            self.archive_text.value = f"{archived[DONE]} finished" + (f", {archived[FAILED]} failed" if archived[FAILED] else "") + " (archived)"
+            self.task_list.refresh()
+            self.scheduler.mark(self)
+    
+    def task_changed(self, record: TaskRecord):
+        #? Progress, status or priority of one task changed
+        with self.lock:
+            self.task_list.task_changed(record)
+    
+    def set_priority(self, record: TaskRecord, priority: int):
+        #! Changes a waiting task's priority, it takes effect at the next free slot
+        with self.lock:
+            self.model.set_priority(record, priority)
+            self.task_changed(record)
     
-    def start_next_task(self):
-        #? Starts the next task when a task is completed
-        self.current_task_index += 1
-        if self.current_task_index < len(self.tasks):
-            if not self.tasks[self.current_task_index].is_running:
-                next_task = self.tasks[self.current_task_index]
-                next_task.start()
+    def move_task(self, record: TaskRecord, target: TaskRecord):
+        #! Drag and drop - the card takes the place of `target`, the task keeps its priority
+        with self.lock:
+            if record is target or record.state == REMOVED or target.state == REMOVED:
+                return  #? One of them left the list in the meantime
+            self.model.move(record, self.model.index(target))
+            self.refresh()
+    
+    def fill_slots(self):
+        #! Starts waiting tasks in priority order until max_concurrent_tasks are in flight
+        with self.lock:
+            self.model.set_shortest_first(self.settings.get_queue_shortest_first())
+            limit = self.settings.get_max_concurrent_tasks()
+            while len(self.running_tasks) < limit:
+                record = self.model.pop_next()
+                if record is None:
+                    break
+                self.running_tasks.add(record)
+                record.handle = self.page.run_task(self.run_task, record)  # type: ignore
+
+            if not self.running_tasks:  #? Nothing left to run, queue can be started again
+                self.is_started = False
+    
+    def task_finished(self, record: TaskRecord, state: str):
+        #? Called when a task ends (finished, failed or cancelled) to free its slot
+        with self.lock:
+            self.running_tasks.discard(record)
+            self.model.archive_after = self.settings.get_queue_archive_after()
+            if self.model.finish(record, state):
+                self.refresh()  #? Old finished cards were archived
+            if self.is_started:
+                self.fill_slots()
     
     def start_queue(self):
-        #! Starts the queue and runs the first task
-        if not self.is_started and len(self.tasks) > 0:
-            if not self.tasks[0].is_running:
+        #! Starts the queue and runs up to max_concurrent_tasks tasks at once
+        with self.lock:
+            if not self.is_started and len(self.tasks) > 0:
+                if self.settings.get_pdf_digest():
+                    self.start_digest()
+                    return
                 self.is_started = True
-                self.current_task_index = 0
-                self.tasks[0].start()
-                self.is_started = False
+                self.fill_slots()
+    
+    def start_digest(self):
+        #! Renders every waiting task into one combined PDF
+        with self.lock:
+            records = self.model.waiting()  #? Oldest first
+            if not records:
+                return
+            for record in records:
+                record.state = RUNNING
+                self.running_tasks.add(record)
+            self.page.run_task(self.run_digest, records)  # type: ignore
+    
+    async def run_digest(self, records: list):
+        by_id = {}
+        for record in records:
+            by_id.setdefault(record.video_id, []).append(record)
+
+        def on_progress(video_id: str, value: float, text: str):
+            for record in by_id.get(video_id, []):
+                self.update_status(record, value, text)
+
+        def on_section(video_id: str, error: str | None):
+            for record in by_id.get(video_id, []):
+                if error is None:
+                    self.update_status(record, 1.0, "Finished")
+                    self.journal_task(record, DONE, pdf=output_path)
+                else:
+                    self.journal_task(record, FAILED, error=error)
+                    self.show_error(record, f"Failed: {error}")
+
+        def include(video_id: str) -> bool:
+            #? Tasks removed while the digest runs are left out
+            return any(record.state != REMOVED for record in by_id.get(video_id, []))
+
+        output_path = os.path.join(self.settings.get_download_path() or "", f"Digest-{time.strftime('%Y%m%d-%H%M%S')}.pdf")
+        try:
+            await self.services.ready.wait()
+            if self.services.error:
+                raise RuntimeError(self.services.error)
+            from services.pipeline import convert_digest
+            await convert_digest(list(by_id), self.settings, self.services.client, output_path, title="Transcript Digest",
+                                 calback_func=on_progress, metrics_writer=self.services.metrics_writer, on_section=on_section,
+                                 include=include)
+        except Exception as e:  #! Nothing could be written, every task shows why
+            for record in records:
+                if record.state == RUNNING:
+                    self.journal_task(record, FAILED, error=str(e))
+                    self.show_error(record, f"Failed: {e}")
+        finally:
+            for record in records:
+                self.task_finished(record, FAILED if record.state == FAILED else DONE)
     
     def expend_controle(self):
-        #? Controls expand property based on task count
-        if 3 <= len(self.tasks):
-            self.expand = True
-        else:
-            self.expand = False
+        #? Controls expand property based on task count, a short list is sized to its cards
+        expanded = 3 <= len(self.tasks)
+        self.expand = expanded
+        self.content.expand = expanded
+        self.task_list.expand = expanded
+        self.task_list.height = None if expanded else len(self.tasks) * ITEM_EXTENT
     
-    def remove_task(self, task):
-        #! Removes task from queue and UI
-        self.task_column.controls.remove(task)
-        self.tasks.remove(task)
-        self.expend_controle()
-        self.update()
+    def cancel_task(self, record: TaskRecord):
+        #! Cancels the task and removes it from the queue and UI
+        with self.lock:
+            if record.state == REMOVED:
+                return  #? Already cancelled or archived
+            self.journal_task(record, REMOVED)  #? Removed tasks are not restored on the next start
+            if record.handle and not record.handle.done():
+                record.handle.cancel()
+            was_running = record.state == RUNNING
+            self.model.remove(record)
+            self.refresh()
+            if was_running:  #? A task cancelled before its first step never reaches its finally block
+                self.running_tasks.discard(record)
+                if self.is_started:
+                    self.fill_slots()
+    
+    def journal_task(self, record: TaskRecord, state: str, **fields):
+        #? Records a state change of a task in the queue journal
+        if self.journal:
+            self.journal.record(record.task_id, state, video_id=record.video_id, **fields)
+    
+    def update_status(self, record: TaskRecord, value: float, text: str):
+        #? Updates task progress (progress bar and text)
+        record.progress = value
+        record.status = "Finished" if value >= 1.0 else text
+        self.task_changed(record)
+    
+    def show_error(self, record: TaskRecord, text: str):
+        #! Marks the task as failed
+        record.status = text
+        record.state = FAILED
+        self.task_changed(record)
+
+    async def run_task(self, record: TaskRecord):
+        #! Main task function - get transcript and create PDF
+        await self.services.ready.wait()  #? Only the first tasks after startup wait here
+        if self.services.error:
+            self.show_error(record, f"Failed: {self.services.error}")
+            self.task_finished(record, FAILED)
+            return
+        from services.pipeline import convert_video
+        from services.transcript import TranscriptError
+        state = DONE
+        try:
+            self.update_status(record, value=0.1, text="API response awaited . . . ")
+            pdf_file = await convert_video(record.video_id, self.settings, self.services.client, self.services.renderer,
+                                           calback_func=lambda value, text: self.update_status(record, value, text),
+                                           metrics_writer=self.services.metrics_writer,
+                                           on_stage=lambda stage: self.journal_task(record, stage))
+            self.journal_task(record, DONE, pdf=pdf_file)
+
+        except asyncio.CancelledError:  #! If task is cancelled, only its slot is released
+            pass
+        except TranscriptError as e:  #! API errors are shown with their classification
+            state = FAILED
+            self.journal_task(record, FAILED, error=str(e))
+            if e.retryable:
+                self.show_error(record, f"Failed after retries: {e}")
+            else:
+                self.show_error(record, f"Failed: {e}")
+        except Exception as e:  #! A failed task must not block the rest of the queue
+            state = FAILED
+            self.journal_task(record, FAILED, error=str(e))
+            self.show_error(record, f"Failed: {e}")
+        finally:
+            self.task_finished(record, state)  #? Frees the slot so the next task can start
+
+
+class TaskListView(ft.ListView):
+    #! Virtualized task list - only the cards around the visible rows are built
+    #? Rows above and below the built window are stood in for by two spacers of the
+    #? same height, so the scroll extent stays right and each update carries a few cards.
+    def __init__(self, queue: VideoQueue):
+        super().__init__(spacing=0, on_scroll=self.on_scroll, on_scroll_interval=50)
+        self.queue = queue
+        self.offset = 0.0  #? Scroll position reported by the client
+        self.viewport = DEFAULT_VIEWPORT
+        self.cards = {}  #? task_id -> VideoTask for the built window
+        self.window = (0, 0)
+        self.top_spacer = ft.Container(height=0)
+        self.bottom_spacer = ft.Container(height=0)
+        self.controls = [self.top_spacer, self.bottom_spacer]
+
+    def _window(self) -> tuple:
+        total = len(self.queue.tasks)
+        self.offset = min(self.offset, max(0, total * ITEM_EXTENT - self.viewport))  #? The list got shorter
+        first = max(0, int(self.offset // ITEM_EXTENT) - OVERSCAN)
+        last = min(total, int((self.offset + self.viewport) // ITEM_EXTENT) + 1 + OVERSCAN)
+        return first, last
+
+    def refresh(self):
+        #! Rebuilds the window of cards, reusing the ones that stay visible
+        tasks = self.queue.tasks
+        first, last = self.window = self._window()
+        cards = {}
+        for record in tasks[first:last]:
+            cards[record.task_id] = self.cards.get(record.task_id) or VideoTask(record, self.queue)
+        self.cards = cards
+        self.top_spacer.height = first * ITEM_EXTENT
+        self.bottom_spacer.height = (len(tasks) - last) * ITEM_EXTENT
+        self.controls = [self.top_spacer, *cards.values(), self.bottom_spacer]
+
+    def on_scroll(self, e: ft.OnScrollEvent):
+        #? Builds the cards scrolled into view once the window has to move
+        self.offset = e.pixels or 0.0
+        self.viewport = e.viewport_dimension or self.viewport
+        with self.queue.lock:  #? Scroll events run on a worker thread too
+            if self._window() != self.window:
+                self.refresh()
+                self.queue.scheduler.mark(self)
+
+    def task_changed(self, record: TaskRecord):
+        #? Only a built card has anything to redraw
+        card = self.cards.get(record.task_id)
+        if card is not None:
+            card.refresh()
+            self.queue.scheduler.mark(card)
 
 
 class VideoTask(ft.Container):
-    #! Class representing a single video conversion task
-    def __init__(self, title: str, queue: VideoQueue, setting: SettingsManager):
-        super().__init__(bgcolor="#333131", border_radius=10, padding=15)
-        self.title = title  #? Video ID or URL
-        self.task = None  #? Asyncio task
+    #! Card showing a single video conversion task
+    #? Built from its TaskRecord whenever it scrolls into view, the record holds all state
+    def __init__(self, record: TaskRecord, queue: VideoQueue):
+        super().__init__(bgcolor="#333131", border_radius=10, padding=15, height=CARD_HEIGHT,
+                         margin=ft.margin.only(bottom=CARD_SPACING))
+        self.record = record
         self.queue = queue  #? Reference to the queue it belongs to
-        self.is_running = False  #? Whether the task is running
-        self.is_complated = False  #? Whether the task is completed
-        self.settings = setting
 
         #? UI components
-        self.text = ft.Text(title, size=14, color=ft.Colors.WHITE70, overflow=ft.TextOverflow.ELLIPSIS, expand=True)
+        self.text = ft.Text(record.video_id, size=14, color=ft.Colors.WHITE70, overflow=ft.TextOverflow.ELLIPSIS, expand=True)
         self.status_bar = ft.ProgressBar(value=0, visible=False)  #? Progress bar
         self.status_text = ft.Text("API response awaited . . . ", size=13, visible=False, color="#008080")  #? Status message
         self.status_percent = ft.Text("%100", size=13, visible=False)  #? Percentage indicator
+        self.priority_menu = ft.PopupMenuButton(  #? Priority picker, the icon colour shows the current one
+            icon=ft.Icons.PLAY_CIRCLE,
+            icon_color=PRIORITY_COLORS[PRIORITY_NORMAL],
+            icon_size=30,
+            tooltip="Priority",
+            items=[
+                ft.PopupMenuItem(text=label, on_click=lambda e, priority=priority: self.change_priority(priority))
+                for priority, label in PRIORITY_LABELS.items()
+            ],
+        )
         
-        #? Content of the task card
-        self.content = ft.Column(
+        #? Content of the task card - cards can be dragged onto each other to reorder the queue
+        card = ft.Column(
             [
                 ft.Row(
                     [
-                        ft.Icon(name=ft.Icons.PLAY_CIRCLE, color=ft.Colors.BLUE, size=30),
+                        self.priority_menu,
                         self.text,
                         ft.IconButton(icon=ft.Icons.CLOSE, icon_color=ft.Colors.WHITE70, icon_size=20, on_click=self.cancel_task)
                     ]
@@ -92,50 +449,163 @@ class VideoTask(ft.Container):
                     ],
                     alignment=ft.MainAxisAlignment.SPACE_BETWEEN
                 )
-            ]
+            ],
+            spacing=6
         )
+        self.content = ft.DragTarget(
+            group="queue",
+            on_accept=self.on_drop,
+            content=ft.Draggable(
+                group="queue",
+                data=record,
+                content=card,
+                content_feedback=ft.Text(record.video_id, size=14, color=ft.Colors.WHITE70),
+            ),
+        )
+        self.refresh()
     
-    def update_status(self, value: float, text: str):
-        #? Updates task progress (progress bar and text)
-        self.status_bar.visible = True
-        self.status_percent.visible = True
-        self.status_percent.value = f"%{int(value*100)}"
-        self.status_text.visible = True
-        self.status_text.value = text
-        self.status_bar.value = value
-
-        if value >= 1.0:  #? When task is completed, green color and "finished" message
+    def refresh(self):
+        #? Copies the record's state into the card controls
+        record = self.record
+        started = record.progress is not None
+        self.priority_menu.icon_color = PRIORITY_COLORS[record.priority]
+        self.status_bar.visible = started
+        self.status_bar.value = record.progress or 0
+        self.status_text.visible = started or record.state == FAILED
+        self.status_text.value = record.status
+        self.status_percent.visible = started and record.state != FAILED
+        self.status_percent.value = f"%{int((record.progress or 0)*100)}"
+        if record.state == FAILED:
+            self.status_text.color = ft.Colors.RED_300
+        elif (record.progress or 0) >= 1.0:  #? When task is completed, green color and "finished" message
             self.status_text.color = "#32cd32"
-            self.status_text.value = "Finished"
-        self.update()
+        else:
+            self.status_text.color = "#008080"
+    
+    def on_drop(self, e: ft.DragTargetEvent):
+        #? A card dropped on this one takes its place, this card moves down
+        source = self.page.get_control(e.src_id)  # type: ignore
+        dragged = source.data if source is not None else None
+        if dragged is not None:
+            self.queue.move_task(dragged, self.record)
+    
+    def change_priority(self, priority: int):
+        #? Priority menu handler
+        self.queue.set_priority(self.record, priority)
     
     def cancel_task(self, e):
         #! Cancels the task and removes it from UI
-        if self.task and not self.task.done():
-            self.task.cancel()
+        self.queue.cancel_task(self.record)
+
+
+#? Snippet marks around search hits, split into highlighted spans
+HIT_START, HIT_END = "\x02", "\x03"
+
+
+class SearchPanel(ft.Container):
+    """
+    #! Full-text search over every fetched transcript
+    #? Each result shows the video, its timestamp in milliseconds and the matching text.
+    #? The matches can be exported to one PDF straight from the index, without the API.
+    """
+
+    def __init__(self, setting: SettingsManager, services: AppServices):
+        super().__init__()
+        self.settings = setting
+        self.services = services
+        self.hits = []
         
-        self.queue.remove_task(self)
+        #? Search field - Enter runs the search
+        self.query = ft.TextField(
+            hint_text="Search transcripts",
+            prefix_icon=ft.Icons.SEARCH,
+            border_radius=25,
+            filled=True,
+            bgcolor="#2a2a2a",
+            border_color=ft.Colors.BLUE,
+            text_size=13,
+            width=340,
+            on_submit=self.search
+        )
+        
+        #? Result rows
+        self.results = ft.ListView(spacing=6, height=300, width=340)
+        
+        #? Export button - enabled once there are results
+        self.export_button = ft.TextButton(
+            text="Export matches to PDF",
+            icon=ft.Icons.PICTURE_AS_PDF,
+            disabled=True,
+            on_click=self.export
+        )
+        
+        self.status_text = ft.Text("", size=12, color=ft.Colors.WHITE70)
+        
+        self.content = ft.Column([self.query, self.status_text, self.results, self.export_button], tight=True, spacing=10)
 
-    async def taskl(self):
-        #! Main task function - get transcript and create PDF
-        try:
-            self.update_status(value=0.1, text="API response awaited . . . ")
-            if self.settings.get_api_key():
-                pdf_text_sheet = await get_transcript(self.title, api=self.settings.get_api_key())  #? Transcript is retrieved from API
+    async def search(self, e):
+        #! Runs the query on the index and lists the matches
+        await self.services.ready.wait()
+        if self.services.index is None:
+            self.show_status("Search index is turned off in settings", ft.Colors.ORANGE)
+            return
+        query = (self.query.value or "").strip()
+        self.hits = await asyncio.to_thread(self.services.index.search, query, 100, None, (HIT_START, HIT_END))
+        self.results.controls = [self.result_row(hit) for hit in self.hits]
+        self.export_button.disabled = not self.hits
+        self.show_status(f"{len(self.hits)} matches" if self.hits else "No matches", ft.Colors.WHITE70)
 
-            if self.settings.get_download_path():
-                create_pdf(self.title, transcript_text=pdf_text_sheet, calback_func=self.update_status, output_dir=self.settings.get_download_path())  # type: ignore  #? PDF is created
-            self.queue.start_next_task()  #? Move to next task after completion
+    def result_row(self, hit) -> ft.Control:
+        #? Video ID and timestamp above the snippet, hit terms highlighted
+        from services.search_index import format_ms  #? Loaded with the services, not before the first window
+        spans = []
+        for index, part in enumerate(hit.snippet.split(HIT_START)):
+            marked, _, rest = part.partition(HIT_END) if index else ("", "", part)
+            if marked:
+                spans.append(ft.TextSpan(marked, ft.TextStyle(color=ft.Colors.AMBER, weight=ft.FontWeight.BOLD)))
+            if rest:
+                spans.append(ft.TextSpan(rest))
+        return ft.Container(
+            content=ft.Column(
+                [
+                    ft.Row([
+                        ft.Text(hit.video_id, size=12, color=ft.Colors.BLUE_200, selectable=True),
+                        ft.Text(format_ms(hit.start_ms), size=12, color=ft.Colors.WHITE54),
+                    ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN),
+                    ft.Text(spans=spans, size=13),
+                ],
+                spacing=2
+            ),
+            padding=8,
+            border_radius=8,
+            bgcolor="#2a2a2a"
+        )
 
-        except asyncio.CancelledError:  #! If task is cancelled, move to next one
-            if self.queue:
-                self.queue.start_next_task()
-    
-    def start(self):
-        #? Starts the task
-        if not self.is_running and not self.is_complated:
-            self.is_running = True
-            self.task = self.page.run_task(self.taskl)  # type: ignore
+    async def export(self, e):
+        #! Renders the segments around the current matches into the download folder
+        output_dir = self.settings.get_download_path()
+        if not output_dir or not self.hits:
+            self.show_status("Select a download folder in settings first", ft.Colors.ORANGE)
+            return
+        from services.pipeline import convert_search
+        query = (self.query.value or "").strip()
+        name = "".join(c if c.isalnum() or c in " -_" else "_" for c in query).strip()[:60] or "results"
+        self.export_button.disabled = True
+        self.show_status("Exporting . . .", ft.Colors.WHITE70)
+        try:
+            pdf_file = await convert_search(self.services.index, self.hits, os.path.join(output_dir, f"Search - {name}.pdf"),
+                                            title=query)
+            self.show_status(f"Saved {os.path.basename(pdf_file)}", ft.Colors.GREEN_300)
+        except Exception as ex:
+            self.show_status(f"Export failed: {ex}", ft.Colors.RED)
+        finally:
+            self.export_button.disabled = False
+            self.update()
+
+    def show_status(self, text: str, color):
+        self.status_text.value = text
+        self.status_text.color = color
+        self.update()
 
 
 class SettingsPanel(ft.Container):
@@ -171,6 +641,70 @@ class SettingsPanel(ft.Container):
             overflow=ft.TextOverflow.ELLIPSIS
         )
         
+        #? Parallel conversions slider
+        self.concurrency = ft.Slider(
+            min=1,
+            max=10,
+            divisions=9,
+            label="{value}",
+            value=setting.get_max_concurrent_tasks(),
+            width=300
+        )
+        
+        #? Transcript cache switch
+        self.use_cache = ft.Switch(
+            label="Reuse downloaded transcripts",
+            value=setting.get_transcript_cache_enabled()
+        )
+        
+        #? Timestamp headings switch
+        self.timestamps = ft.Switch(
+            label="Timestamp headings in PDF",
+            value=setting.get_pdf_timestamps()
+        )
+        
+        #? Canvas renderer - same layout, skips platypus for plain transcripts
+        self.fast_pdf = ft.Switch(
+            label="Fast PDF renderer",
+            value=setting.get_pdf_engine() == "canvas"
+        )
+        
+        #? Shortest-job-first - waiting videos with smaller cached transcripts start first
+        self.shortest_first = ft.Switch(
+            label="Shortest videos first",
+            value=setting.get_queue_shortest_first()
+        )
+        
+        #? Digest mode - the whole queue becomes one PDF with a table of contents
+        self.digest = ft.Switch(
+            label="Combine queue into one PDF",
+            value=setting.get_pdf_digest()
+        )
+        
+        #? Caption clean-up - drops text repeated by rolling auto-captions
+        self.dedupe = ft.Switch(
+            label="Remove repeated caption text",
+            value=setting.get_pdf_dedupe_captions()
+        )
+        
+        #? Sentence rebuild - regroups caption fragments into whole sentences
+        self.sentences = ft.Switch(
+            label="Rebuild sentences",
+            value=setting.get_pdf_rebuild_sentences()
+        )
+        
+        #? Unchanged outputs - a PDF rendered earlier from the same transcript and options is kept
+        self.skip_unchanged = ft.Switch(
+            label="Skip unchanged PDFs",
+            value=setting.get_pdf_skip_unchanged()
+        )
+        
+        #? Search index - fetched transcripts become searchable (applies on next start)
+        self.search_index = ft.Switch(
+            label="Index transcripts for search",
+            value=setting.get_search_index_enabled()
+        )
+        
         #? Status message
         self.status_text = ft.Text(
             "Settings saved ✓",
@@ -222,6 +756,38 @@ class SettingsPanel(ft.Container):
                         padding=ft.padding.only(bottom=20)
                     ),
                     
+                    #? Parallel conversions section
+                    ft.Container(
+                        content=ft.Column(
+                            [
+                                ft.Text("Parallel Conversions", size=16, weight=ft.FontWeight.BOLD),
+                                self.concurrency
+                            ],
+                            spacing=10
+                        ),
+                        padding=ft.padding.only(bottom=20)
+                    ),
+                    
+                    #? Conversion options section
+                    ft.Container(
+                        content=ft.Column(
+                            [
+                                ft.Text("Options", size=16, weight=ft.FontWeight.BOLD),
+                                self.use_cache,
+                                self.timestamps,
+                                self.fast_pdf,
+                                self.shortest_first,
+                                self.digest,
+                                self.dedupe,
+                                self.sentences,
+                                self.skip_unchanged,
+                                self.search_index
+                            ],
+                            spacing=10
+                        ),
+                        padding=ft.padding.only(bottom=20)
+                    ),
+                    
                     #? Status message display
                     self.status_text,
                     
@@ -266,6 +832,34 @@ class SettingsPanel(ft.Container):
         if self.temp_download_path:
             self.settings.set_download_path(self.temp_download_path)
         
+        #? Save parallel task limit
+        self.settings.set_max_concurrent_tasks(int(self.concurrency.value or 1))
+        
+        #? Save transcript cache switch
+        self.settings.set_transcript_cache_enabled(bool(self.use_cache.value))
+        
+        #? Save timestamp headings switch
+        self.settings.set_pdf_timestamps(bool(self.timestamps.value))
+        
+        #? Save PDF renderer
+        self.settings.set_pdf_engine("canvas" if self.fast_pdf.value else "platypus")
+        
+        #? Save queue order policy
+        self.settings.set_queue_shortest_first(bool(self.shortest_first.value))
+        
+        #? Save digest mode
+        self.settings.set_pdf_digest(bool(self.digest.value))
+        
+        #? Save caption clean-up options
+        self.settings.set_pdf_dedupe_captions(bool(self.dedupe.value))
+        self.settings.set_pdf_rebuild_sentences(bool(self.sentences.value))
+        
+        #? Save unchanged output skipping
+        self.settings.set_pdf_skip_unchanged(bool(self.skip_unchanged.value))
+        
+        #? Save search indexing switch
+        self.settings.set_search_index_enabled(bool(self.search_index.value))
+        
         #? Show success message
         self.status_text.visible = True
         self.update()
@@ -291,45 +885,55 @@ def check_api_dwpath(setting: SettingsManager):
         return True
 
 
-def extract_youtube_id(url: str) -> str | None:
-    #! Extracts video ID from YouTube URL
-    #? Different YouTube URL format patterns
-    patterns = [
-        r'(?:youtube\.com/watch\?v=|youtu\.be/)([a-zA-Z0-9_-]{11})(?:[&?]|$)',  #? watch?v= or youtu.be/
-        r'youtube\.com/embed/([a-zA-Z0-9_-]{11})',  #? embed/
-        r'youtube\.com/v/([a-zA-Z0-9_-]{11})',  #? /v/
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, url)
-        if match:
-            return match.group(1)
-    
-    return None
+def import_video_ids(field: ft.TextField, queue: VideoQueue, video_ids: list):
+    #! Adds a batch of video IDs and reports the outcome under the URL field
+    added = queue.add_tasks(video_ids)
+    skipped = len(video_ids) - added
+    if not video_ids:
+        field.error_text = "❌ No YouTube links found"
+        field.border_color = ft.Colors.RED
+        field.helper_text = None
+    else:
+        field.error_text = None
+        field.border_color = ft.Colors.BLUE
+        field.helper_text = f"✅ {added} videos added" + (f", {skipped} already in the queue" if skipped else "")
+        field.value = None
+    field.update()
 
 
-def validate_youtube_url(e, queue: VideoQueue, setting: SettingsManager):
+def validate_youtube_url(e, queue: VideoQueue):
     #! YouTube URL validation and task addition function
     if not e.control.value:
         return
     
     url = e.control.value.strip()
+    e.control.helper_text = None
+
+    #? Pasted lists (one or many links per line) are added in one batch
+    video_ids = extract_youtube_ids(url)
+    if len(video_ids) > 1:
+        import_video_ids(e.control, queue, video_ids)
+        return
     
     #? Extract video ID
     video_id = extract_youtube_id(url)
 
-    if video_id:
+    if video_id and queue.find_active(video_id):
+        #! Same video is already waiting or converting
+        e.control.error_text = "⚠️ This video is already in the queue"
+        e.control.border_color = ft.Colors.ORANGE
+    elif video_id:
         #! Valid URL
         e.control.error_text = None
         e.control.border_color = ft.Colors.BLUE
-        queue.add_task(setting=setting, title=video_id)
+        queue.add_task(title=video_id)
         e.control.value = None  #? Clear input
     else:
         #! Invalid URL
         e.control.error_text = "❌ Invalid YouTube URL"
         e.control.border_color = ft.Colors.RED
     
-    e.page.update()
+    e.control.update()  #? The queue itself is flushed by its UpdateScheduler
 
 
 def main(page: ft.Page):
@@ -345,17 +949,46 @@ def main(page: ft.Page):
     page.vertical_alignment = ft.MainAxisAlignment.START
     page.horizontal_alignment = ft.CrossAxisAlignment.CENTER
     
-    settings = SettingsManager("services/settings/settings.json")
+    settings = SettingsManager(SETTINGS_FILE)
+    
+    #! Heavy services are loaded once the window is on screen (see the end of main)
+    services = AppServices(settings)
+    
+    async def on_window_event(e: ft.WindowEvent):
+        #? Cleans up before the window goes away
+        if e.type == ft.WindowEventType.CLOSE:
+            try:
+                await services.close()
+            finally:
+                page.window.destroy()  #? prevent_close is on, a failed clean-up must not keep the window open
+    
+    page.window.prevent_close = True
+    page.window.on_event = on_window_event
+    page.on_close = lambda e: page.run_task(services.close)  #? Web sessions have no window event
     
     #! Store SettingsPanel reference
     settings_panel_ref = None
     
     def on_folder_result(e: ft.FilePickerResultEvent):
-        #? FilePicker callback - runs when folder is selected
-        if e.path and settings_panel_ref:
+        #? FilePicker callback - runs when a folder (settings) or import files are selected
+        if e.files:
+            import_files(e.files)
+        elif e.path and settings_panel_ref:
             #? Temporarily update (not yet saved)
             settings_panel_ref.update_temp_folder_path(e.path)
     
+    def import_files(files: list):
+        #! Reads every selected .txt / .csv file and adds all links found in one batch
+        video_ids = []
+        for file in files:
+            if not file.path:
+                continue  #? Web sessions get no local path
+            try:
+                video_ids.extend(read_youtube_ids(file.path))
+            except OSError:
+                continue
+        import_video_ids(url_input, video_queue, list(dict.fromkeys(video_ids)))
+    
     #? Create FilePicker
     file_pickers = ft.FilePicker(on_result=on_folder_result)
     
@@ -371,7 +1004,19 @@ def main(page: ft.Page):
 
     page.overlay.append(file_pickers)
     
-    video_queue = VideoQueue()  #? Create video queue
+    #? Search dialog - full-text search over every fetched transcript
+    search_dlg = ft.AlertDialog(
+        title=ft.Text("Search", size=20, weight=ft.FontWeight.BOLD),
+        content=SearchPanel(setting=settings, services=services),
+        alignment=ft.alignment.center,
+    )
+    
+    video_queue = VideoQueue(setting=settings, services=services, scheduler=UpdateScheduler(page),
+                             journal=QueueJournal(os.path.join(app_data_dir("queue"), "journal.jsonl")))
+    
+    #! Rebuild the unfinished part of the last session's queue
+    restored = video_queue.journal.replay()
+    video_queue.add_tasks([record["video_id"] for record in restored], [record["id"] for record in restored])
     
     #? Header section - Logo and title
     header = ft.Container(
@@ -394,9 +1039,23 @@ def main(page: ft.Page):
         bgcolor="#2a2a2a",
         border_color=ft.Colors.BLUE,
         focused_border_color=ft.Colors.BLUE_400,
-        height=60,
+        multiline=True,  #? Pasted lists keep their line breaks
+        min_lines=1,
+        max_lines=4,
+        shift_enter=True,  #? Enter submits, Shift+Enter starts a new line
         text_size=16,
-        on_blur=lambda e: validate_youtube_url(e, video_queue, settings)  #? Validate URL on focus loss
+        on_blur=lambda e: validate_youtube_url(e, video_queue),  #? Validate URL on focus loss
+        on_submit=lambda e: validate_youtube_url(e, video_queue),
+        suffix=ft.IconButton(
+            icon=ft.Icons.UPLOAD_FILE,
+            tooltip="Import links from .txt / .csv files",
+            on_click=lambda e: file_pickers.pick_files(
+                dialog_title="Import YouTube links",
+                allow_multiple=True,
+                file_type=ft.FilePickerFileType.CUSTOM,
+                allowed_extensions=IMPORT_EXTENSIONS,
+            ),
+        ),
     )
     
     #? YouTube video link display area
@@ -434,7 +1093,10 @@ def main(page: ft.Page):
     main_content = ft.Container(
         content=ft.Column(
             [
-                ft.Row([ft.IconButton(icon=ft.Icons.SETTINGS, on_click=lambda e: page.open(dlg))], alignment=ft.MainAxisAlignment.END),
+                ft.Row([
+                    ft.IconButton(icon=ft.Icons.SEARCH, tooltip="Search transcripts", on_click=lambda e: page.open(search_dlg)),
+                    ft.IconButton(icon=ft.Icons.SETTINGS, on_click=lambda e: page.open(dlg)),
+                ], alignment=ft.MainAxisAlignment.END),
                 header,
                 ft.Container(height=20),
                 url_input,
@@ -464,7 +1126,12 @@ def main(page: ft.Page):
             expand=True,
         )
     )
+    
+    #! First frame is out, load and warm up the heavy services in the background
+    page.run_task(services.load)
 
 
 #! Start the application
-ft.app(target=main)
\ No newline at end of file
+if __name__ == "__main__":  #? Guard keeps PDF worker processes from opening the app again
+    multiprocessing.freeze_support()
+    ft.app(target=main)
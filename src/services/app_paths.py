@@ -0,0 +1,28 @@
+import os
+import platform
+
+#! Folder name used under the platform data directory
+APP_NAME = "Transcriptor"
+
+#! Settings file shipped next to the services, resolved relative to the package instead of the CWD
+SETTINGS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "settings", "settings.json")
+
+
+def app_data_dir(*parts: str) -> str:
+    """
+    #! Returns (and creates) the per-user application data directory
+    #? Packaged Flet apps get FLET_APP_STORAGE_DATA, otherwise the platform default is used
+    """
+    base = os.environ.get("FLET_APP_STORAGE_DATA")
+    if not base:
+        system = platform.system()
+        if system == "Windows":
+            base = os.path.join(os.environ.get("LOCALAPPDATA") or os.path.expanduser("~"), APP_NAME)
+        elif system == "Darwin":
+            base = os.path.join(os.path.expanduser("~/Library/Application Support"), APP_NAME)
+        else:
+            base = os.path.join(os.environ.get("XDG_DATA_HOME") or os.path.expanduser("~/.local/share"), APP_NAME.lower())
+
+    path = os.path.join(base, *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
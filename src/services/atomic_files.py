@@ -0,0 +1,62 @@
+import contextlib
+import os
+import threading
+
+try:
+    import fcntl  #? POSIX file locking
+except ImportError:  #? Windows
+    fcntl = None
+    import msvcrt
+
+
+class FileLock:
+    """
+    #! Exclusive inter-process lock held on a side file
+    #? Serializes read-modify-write cycles of several processes (app, headless workers)
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fd = None
+
+    def __enter__(self):
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        if fcntl:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+        else:
+            while True:
+                try:
+                    msvcrt.locking(self._fd, msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue  #? LK_LOCK gives up after ~10 seconds, keep waiting
+        return self
+
+    def __exit__(self, *exc):
+        try:
+            if fcntl:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(self._fd)
+            self._fd = None
+
+
+def temp_path(path: str) -> str:
+    #? Sibling temp file, unique per process and thread (same folder, so the rename is atomic)
+    return f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+
+@contextlib.contextmanager
+def atomic_output(path: str):
+    #! Yields a temp path to write to, renamed over `path` only if the block finishes
+    #? An interrupted or failed write leaves the previous file untouched and no partial file behind
+    tmp_path = temp_path(path)
+    try:
+        yield tmp_path
+        os.replace(tmp_path, path)
+    finally:
+        with contextlib.suppress(OSError):
+            os.remove(tmp_path)
@@ -0,0 +1,80 @@
+import os
+import threading
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+
+#! Fonts folder shipped with the app, resolved relative to the package instead of the CWD
+ASSETS_FONTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets", "fonts")
+
+#! Paths to check for font availability
+FONT_PATHS = [
+    os.path.join(ASSETS_FONTS_DIR, "arial.ttf"),  # project-level font
+    os.path.join(ASSETS_FONTS_DIR, "Arial.ttf"),
+    r'C:\Windows\Fonts\arial.ttf',
+    '/Library/Fonts/Arial.ttf',
+]
+
+#? Built-in fallback when no TTF file can be loaded
+DEFAULT_FONT = "Helvetica"
+
+_font_name = None  #? Cached result, also remembers the Helvetica fallback
+_lock = threading.Lock()
+_glyph_widths = {}  #? font name -> GlyphWidths
+
+
+def _register_font() -> str:
+    #! Parses and registers Arial once, returns the usable font name
+    try:
+        for font_path in FONT_PATHS:
+            if os.path.exists(font_path):
+                pdfmetrics.registerFont(TTFont('Arial', font_path))
+                return 'Arial'
+    except Exception as e:
+        print(f"Font load error, using default: {e}")
+    return DEFAULT_FONT
+
+
+def get_font_name() -> str:
+    #? Returns the registered font name, registering it on first call only
+    global _font_name
+    if _font_name is None:
+        with _lock:
+            if _font_name is None:
+                _font_name = _register_font()
+    return _font_name
+
+
+def warm_up():
+    #? Registers the font ahead of time (app startup or pool worker initializer)
+    get_font_name()
+
+
+class GlyphWidths(dict):
+    """
+    #! Character -> advance width at 1pt for one registered font
+    #? TTF fonts are filled from their width table up front, anything else
+    #? (standard fonts, characters missing from the table) is measured once.
+    """
+
+    def __init__(self, font_name: str):
+        super().__init__()
+        self.font_name = font_name
+        face = getattr(pdfmetrics.getFont(font_name), "face", None)
+        char_widths = getattr(face, "charWidths", None)
+        if char_widths:
+            self.update((chr(code), width / 1000.0) for code, width in char_widths.items())
+
+    def __missing__(self, char: str) -> float:
+        width = pdfmetrics.stringWidth(char, self.font_name, 1)
+        self[char] = width
+        return width
+
+
+def glyph_widths(font_name: str | None = None) -> GlyphWidths:
+    #? Returns the shared width table of a font (default: the registered app font)
+    font_name = font_name or get_font_name()
+    table = _glyph_widths.get(font_name)
+    if table is None:
+        with _lock:
+            table = _glyph_widths.setdefault(font_name, GlyphWidths(font_name))
+    return table
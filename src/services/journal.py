@@ -0,0 +1,101 @@
+import json
+import os
+import threading
+import time
+
+#? Task states written to the journal, in pipeline order
+QUEUED = "queued"
+FETCHING = "fetching"
+RENDERING = "rendering"
+DONE = "done"
+FAILED = "failed"
+REMOVED = "removed"  #? Cancelled or removed by the user, never restored
+
+
+class QueueJournal:
+    """
+    #! Append-only JSONL journal of queue task states
+    #? Every state change is one line. replay() folds the lines into the latest
+    #? state per task so an interrupted batch can be rebuilt, and compaction
+    #? rewrites the file with only the records that still matter.
+    """
+
+    def __init__(self, path: str, keep_done: bool = False, compact_after: int = 1000):
+        self.path = path
+        self.keep_done = keep_done  #? Keep finished tasks (the CLI skips them on resume)
+        self.compact_after = compact_after  #? Appended lines that trigger a compaction
+        self.tasks = {}  #? task_id -> latest record, in first-seen order
+        self._appended = 0
+        self._lock = threading.Lock()  #? Records come from the event loop and handler threads
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def replay(self) -> list:
+        #! Reads the journal and returns the unfinished tasks in queue order
+        self.tasks = {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  #? Torn last line after a crash
+                    previous = self.tasks.get(record["id"], {})
+                    self.tasks[record["id"]] = {**previous, **record}
+        except FileNotFoundError:
+            pass
+        self.compact()
+        return [record for record in self.tasks.values() if record["state"] not in (DONE, REMOVED)]
+
+    def record(self, task_id: str, state: str, **fields):
+        #! Appends one state change, finished tasks are synced to disk
+        record = {"id": task_id, "state": state, "ts": round(time.time(), 3), **fields}
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            self.tasks[task_id] = {**self.tasks.get(task_id, {}), **record}
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line)
+                if state == DONE:
+                    f.flush()
+                    os.fsync(f.fileno())  #? A finished video must never be redone
+            self._appended += 1
+            should_compact = self._appended >= self.compact_after
+        if should_compact:
+            self.compact()
+
+    def record_many(self, state: str, entries):
+        #! Appends the same state change for many tasks with a single write (bulk imports)
+        #? entries yields (task_id, extra fields) pairs
+        ts = round(time.time(), 3)
+        lines = []
+        with self._lock:
+            for task_id, fields in entries:
+                record = {"id": task_id, "state": state, "ts": ts, **fields}
+                self.tasks[task_id] = {**self.tasks.get(task_id, {}), **record}
+                lines.append(json.dumps(record, ensure_ascii=False) + "\n")
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.writelines(lines)
+            self._appended += len(lines)
+            should_compact = self._appended >= self.compact_after
+        if should_compact:
+            self.compact()
+
+    def state_of(self, task_id: str) -> str | None:
+        record = self.tasks.get(task_id)
+        return record["state"] if record else None
+
+    def compact(self):
+        #! Rewrites the journal with one line per task that still matters
+        with self._lock:
+            keep = (DONE,) if self.keep_done else ()
+            self.tasks = {
+                task_id: record for task_id, record in self.tasks.items()
+                if record["state"] not in (DONE, REMOVED) or record["state"] in keep
+            }
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                for record in self.tasks.values():
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)  #? Either the old or the new journal, never half of one
+            self._appended = 0
@@ -0,0 +1,57 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+
+class TaskMetrics:
+    """
+    #! Timings and sizes recorded for one conversion task
+    #? Stages add `<name>_seconds` keys, other values are set directly
+    """
+
+    def __init__(self, video_id: str):
+        self.record = {"video_id": video_id, "started_at": round(time.time(), 3)}
+        self._started = time.perf_counter()
+
+    def set(self, key: str, value):
+        self.record[key] = value
+
+    def update(self, values: dict):
+        self.record.update(values)
+
+    @contextmanager
+    def stage(self, name: str):
+        #? Measures the wrapped block as `<name>_seconds`
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record[f"{name}_seconds"] = round(time.perf_counter() - started, 4)
+
+    def finish(self, status: str, error: str | None = None) -> dict:
+        #! Closes the record with the task outcome and total duration
+        self.record["status"] = status
+        if error:
+            self.record["error"] = error
+        self.record["total_seconds"] = round(time.perf_counter() - self._started, 4)
+        return self.record
+
+
+class MetricsWriter:
+    """
+    #! Appends task metric records to a JSONL file
+    #? One line per finished task, safe to call from several tasks and threads
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def write(self, record: dict):
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line)
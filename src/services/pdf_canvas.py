@@ -0,0 +1,141 @@
+from collections import namedtuple
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+from services.fonts import glyph_widths
+
+#? Text style of the canvas renderer, mirrors the ParagraphStyle fields create_pdf uses
+TextStyle = namedtuple("TextStyle", "font_size leading space_before space_after color")
+
+BODY_STYLE = TextStyle(font_size=11, leading=14, space_before=0, space_after=8, color="#000000")
+TIMESTAMP_STYLE = TextStyle(font_size=9, leading=12, space_before=4, space_after=2, color="#008080")
+
+#? SimpleDocTemplate frames keep 6pt of padding inside the page margins
+FRAME_PADDING = 6
+
+#? Share of a space a full line may borrow per word gap (ParagraphStyle.spaceShrinkage)
+SPACE_SHRINKAGE = 0.05
+
+
+class CanvasWriter:
+    """
+    #! Writes plain text paragraphs straight onto a reportlab canvas
+    #? Greedy line wrapping with a precomputed glyph-width table, page breaks and
+    #? spacing follow platypus (SimpleDocTemplate + Paragraph) so both renderers
+    #? give the same page layout, without building and measuring flowables.
+    """
+
+    def __init__(self, path: str, font_name: str, pagesize=A4, margin: float = 50):
+        self.canvas = canvas.Canvas(path, pagesize=pagesize)
+        self.font_name = font_name
+        self.widths = glyph_widths(font_name)
+        self.left = margin + FRAME_PADDING
+        self.width = pagesize[0] - 2 * (margin + FRAME_PADDING)
+        self.top = pagesize[1] - margin - FRAME_PADDING
+        self.bottom = margin + FRAME_PADDING
+        self.y = self.top
+        self.page = 1
+        self._at_top = True  #? Space before is dropped at the top of a page, like in a platypus frame
+        self._space_after = 0.0
+        self._word_widths = {}  #? Transcripts repeat words a lot, each is measured once
+
+    def _measure(self, word: str) -> float:
+        width = self._word_widths.get(word)
+        if width is None:
+            widths = self.widths
+            width = self._word_widths[word] = sum([widths[char] for char in word])
+        return width
+
+    def _split_long(self, word: str, limit: float) -> list:
+        #? Breaks a word wider than the line into pieces (platypus splitLongWords)
+        pieces = []
+        piece = ""
+        used = 0.0
+        for char in word:
+            width = self.widths[char]
+            if piece and used + width > limit:
+                pieces.append(piece)
+                piece, used = "", 0.0
+            piece += char
+            used += width
+        pieces.append(piece)
+        return pieces
+
+    def wrap(self, text: str, style: TextStyle) -> list:
+        #! Greedy word wrap, returns the lines of a paragraph ('\n' forces a break)
+        limit = self.width / style.font_size  #? Widths are compared at 1pt
+        space = self.widths[" "]
+        shrink = SPACE_SHRINKAGE * space
+        lines = []
+        for hard_line in text.split("\n"):
+            line = []
+            used = 0.0
+            for word in hard_line.split():
+                width = self._measure(word)
+                if width > limit:
+                    *full, word = self._split_long(word, limit)
+                    for piece in full:
+                        if line:
+                            lines.append(" ".join(line))
+                        line, used = [], 0.0
+                        lines.append(piece)
+                    width = self._measure(word)
+                if line and used + space + width > limit + shrink * len(line):
+                    lines.append(" ".join(line))
+                    line, used = [], 0.0
+                used = used + space + width if line else width
+                line.append(word)
+            lines.append(" ".join(line))
+        return lines
+
+    def new_page(self):
+        self.canvas.showPage()
+        self.page += 1
+        self.y = self.top
+        self._at_top = True
+        self._space_after = 0.0
+
+    def draw(self, lines: list, style: TextStyle, reserve: float = 0.0):
+        """
+        #! Draws wrapped lines as one paragraph, continuing on new pages as needed
+        #? `reserve` is the height of what must stay on the same page (keep with next),
+        #? the group moves to a new page unless it is taller than a whole page.
+        #? A paragraph never leaves a single first line at the bottom of a page.
+        """
+        if not self._at_top:
+            self.y -= max(self._space_after, style.space_before)
+            if reserve:
+                needed = len(lines) * style.leading + reserve
+                move = self.y - needed < self.bottom and needed <= self.top - self.bottom
+            else:
+                move = self.y - min(len(lines), 2) * style.leading < self.bottom
+            if move:
+                self.new_page()
+
+        index = 0
+        while index < len(lines):
+            fit = int((self.y - self.bottom) // style.leading)
+            if fit <= 0:
+                self.new_page()
+                continue
+            chunk = lines[index:index + fit]
+            text = self.canvas.beginText(self.left, self.y - style.font_size)
+            text.setFont(self.font_name, style.font_size, style.leading)
+            text.setFillColor(style.color)
+            for line in chunk:
+                text.textLine(line)
+            self.canvas.drawText(text)
+            self.y -= len(chunk) * style.leading
+            self._at_top = False
+            index += len(chunk)
+            if index < len(lines):
+                self.new_page()
+        self._space_after = style.space_after
+
+    def paragraph(self, text: str, style: TextStyle = BODY_STYLE, reserve: float = 0.0) -> list:
+        #? Wraps and draws one paragraph, returns its lines
+        lines = self.wrap(text, style)
+        self.draw(lines, style, reserve)
+        return lines
+
+    def save(self):
+        self.canvas.save()
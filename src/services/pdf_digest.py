@@ -0,0 +1,126 @@
+import contextlib
+import math
+import os
+from services.atomic_files import temp_path
+from services.fonts import get_font_name
+from services.pdf_canvas import CanvasWriter, TextStyle
+from services.pdf_generate import draw_transcript
+
+#? Section title at the top of every video's first page
+SECTION_STYLE = TextStyle(font_size=16, leading=20, space_before=0, space_after=10, color="#000000")
+
+#? Table of contents rows
+CONTENTS_TITLE_STYLE = TextStyle(font_size=18, leading=24, space_before=0, space_after=12, color="#000000")
+CONTENTS_ROW_STYLE = TextStyle(font_size=11, leading=18, space_before=0, space_after=0, color="#000000")
+
+
+class DigestWriter:
+    """
+    #! Renders many transcripts into one PDF in a single pass
+    #? One canvas, one embedded font subset. The table of contents pages are
+    #? reserved up front as forms that are only filled in when the document is
+    #? closed, so sections can be written in the order their transcripts arrive.
+    #? Every section also gets a PDF outline (bookmark) entry.
+    """
+
+    def __init__(self, path: str, title: str = "Transcripts", expected_sections: int = 1):
+        self.path = path
+        self.title = title
+        self._tmp_path = temp_path(path)  #? The canvas writes here, close() renames it over `path`
+        self.writer = CanvasWriter(self._tmp_path, get_font_name())
+        self.sections = []  #? (title, first page) in document order
+        rows_first = int((self._usable_height() - CONTENTS_TITLE_STYLE.leading - CONTENTS_TITLE_STYLE.space_after)
+                         // CONTENTS_ROW_STYLE.leading)
+        rows_other = int(self._usable_height() // CONTENTS_ROW_STYLE.leading)
+        extra = max(0, expected_sections - rows_first)
+        self._contents_pages = 1 + math.ceil(extra / rows_other)
+        self._rows = [rows_first] + [rows_other] * (self._contents_pages - 1)
+
+        canvas = self.writer.canvas
+        canvas.setTitle(title)
+        for page in range(self._contents_pages):
+            canvas.doForm(f"contents{page}")  #? Filled in by close()
+            for row in range(self._rows[page]):
+                x1, y1, x2, y2 = self._row_rect(page, row)
+                canvas.linkRect("", self._section_key(self._row_index(page, row)), (x1, y1, x2, y2), relative=0)
+            self.writer.new_page()
+
+    def _usable_height(self) -> float:
+        return self.writer.top - self.writer.bottom
+
+    def _row_index(self, page: int, row: int) -> int:
+        return sum(self._rows[:page]) + row
+
+    def _row_top(self, page: int, row: int) -> float:
+        top = self.writer.top
+        if page == 0:
+            top -= CONTENTS_TITLE_STYLE.leading + CONTENTS_TITLE_STYLE.space_after
+        return top - row * CONTENTS_ROW_STYLE.leading
+
+    def _row_rect(self, page: int, row: int):
+        top = self._row_top(page, row)
+        return (self.writer.left, top - CONTENTS_ROW_STYLE.leading, self.writer.left + self.writer.width, top)
+
+    @staticmethod
+    def _section_key(index: int) -> str:
+        return f"section{index}"
+
+    def add_section(self, title: str, transcript, timestamps: bool = False, window_seconds: float = 60.0,
+                    calback_func=None, dedupe: bool = True, sentences: bool = False):
+        #! Appends one video as a new section starting on a fresh page
+        if self.sections:
+            self.writer.new_page()
+        key = self._section_key(len(self.sections))
+        canvas = self.writer.canvas
+        canvas.bookmarkPage(key)
+        canvas.addOutlineEntry(title, key, level=0)
+        self.sections.append((title, self.writer.page))
+        self.writer.paragraph(title, SECTION_STYLE)
+        draw_transcript(self.writer, transcript, timestamps, window_seconds, calback_func, dedupe, sentences)
+
+    def close(self) -> str:
+        #! Fills in the table of contents and writes the file, returns its path
+        canvas = self.writer.canvas
+        capacity = sum(self._rows)
+        for page in range(self._contents_pages):
+            canvas.beginForm(f"contents{page}")
+            if page == 0:
+                canvas.setFont(self.writer.font_name, CONTENTS_TITLE_STYLE.font_size)
+                canvas.drawString(self.writer.left, self.writer.top - CONTENTS_TITLE_STYLE.font_size, "Contents")
+            canvas.setFont(self.writer.font_name, CONTENTS_ROW_STYLE.font_size)
+            for row in range(self._rows[page]):
+                index = self._row_index(page, row)
+                if index >= len(self.sections):
+                    break
+                self._draw_row(page, row, *self.sections[index])
+            canvas.endForm()
+
+        #? Rows without a section still need a link target
+        for index in range(len(self.sections), capacity):
+            canvas.bookmarkPage(self._section_key(index))
+
+        if len(self.sections) > capacity:
+            #? More sections than announced: the rest of the contents follows at the end
+            self.writer.new_page()
+            for title, page in self.sections[capacity:]:
+                self.writer.paragraph(f"{title} - {page}", CONTENTS_ROW_STYLE)
+
+        try:
+            self.writer.save()
+            os.replace(self._tmp_path, self.path)  #? A digest interrupted mid-write never replaces the old one
+        finally:
+            with contextlib.suppress(OSError):
+                os.remove(self._tmp_path)
+        return self.path
+
+    def _draw_row(self, page: int, row: int, title: str, first_page: int):
+        canvas = self.writer.canvas
+        style = CONTENTS_ROW_STYLE
+        baseline = self._row_top(page, row) - style.font_size
+        number = str(first_page)
+        number_width = canvas.stringWidth(number, self.writer.font_name, style.font_size)
+        limit = self.writer.width - number_width - 20
+        while title and canvas.stringWidth(title, self.writer.font_name, style.font_size) > limit:
+            title = title[:-2] + "…"  #? Long titles are shortened to keep the page number visible
+        canvas.drawString(self.writer.left, baseline, title)
+        canvas.drawRightString(self.writer.left + self.writer.width, baseline, number)
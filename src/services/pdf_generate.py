@@ -1,13 +1,185 @@
 from reportlab.lib.pagesizes import A4
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.pdfbase.ttfonts import TTFont
-from reportlab.pdfbase import pdfmetrics
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import mm
-import platform
+from services.fonts import get_font_name
+from services.text_normalize import SENTENCE_END, normalize_segments
+from services.pdf_canvas import CanvasWriter, BODY_STYLE, TIMESTAMP_STYLE
+from services.transcript_stream import Transcript
+from services.atomic_files import atomic_output
+from services.render_manifest import manifest_for, render_key
 import os
+import time
 
-def create_pdf(video_title: str, transcript_text, output_dir="", calback_func=None):
+#? A paragraph is closed at the latest after this many characters
+MAX_PARAGRAPH_CHARS = 2000
+
+#? Available renderers: full platypus layout, or direct canvas drawing for plain text
+ENGINES = ("platypus", "canvas")
+
+#? Part of every render key - bump it when a layout change alters the output, so older PDFs are rendered again
+RENDER_VERSION = 1
+
+
+class _LazyStory:
+    """
+    #! Minimal list stand-in for platypus
+    #? doc.build only touches the front of the story (index, slice, delete and
+    #? insert at 0), so flowables are pulled from the generator when layout
+    #? reaches them instead of being built up front.
+    """
+
+    def __init__(self, flowables, lookahead: int = 8):
+        self._source = iter(flowables)
+        self._buffer = []
+        self._lookahead = lookahead  #? Covers keepWithNext groups (heading + paragraph)
+
+    def _fill(self, count: int):
+        #? Pulls flowables until the buffer holds `count` items or the source is empty
+        while len(self._buffer) < count and self._source is not None:
+            try:
+                self._buffer.append(next(self._source))
+            except StopIteration:
+                self._source = None
+
+    def _need(self, index):
+        if isinstance(index, slice):
+            self._fill(self._lookahead if index.stop is None else max(index.stop, 0))
+        else:
+            self._fill(index + 1)
+
+    def __len__(self):
+        self._fill(self._lookahead)
+        return len(self._buffer)
+
+    def __getitem__(self, index):
+        self._need(index)
+        return self._buffer[index]
+
+    def __setitem__(self, index, value):
+        self._need(index)
+        self._buffer[index] = value
+
+    def __delitem__(self, index):
+        self._need(index)
+        del self._buffer[index]
+
+    def insert(self, index: int, value):
+        self._buffer.insert(index, value)
+
+
+def format_timestamp(seconds: float) -> str:
+    #? 3725.4 -> "01:02:05"
+    seconds = int(seconds)
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+def group_segments(transcript_text, window_seconds: float = 60.0, escape: bool = False, dedupe: bool = True,
+                   sentences: bool = False):
+    """
+    #! Groups transcript entries into paragraphs
+    #? A paragraph is closed at the first sentence end once `window_seconds`
+    #? of speech are collected, or unconditionally after twice the window or
+    #? MAX_PARAGRAPH_CHARS characters. Entries without timing are grouped by length.
+    #? Text is cleaned on the way by normalize_segments (escape / dedupe / sentences).
+    #? Yields (start seconds or None, list of texts, entries consumed so far).
+    """
+    texts = []
+    length = 0
+    start = None
+
+    for text, entry_start, consumed in normalize_segments(transcript_text, escape, dedupe, sentences):
+        if not texts:
+            start = entry_start
+        texts.append(text)
+        length += len(text) + 1
+
+        elapsed = (entry_start - start) if entry_start is not None and start is not None else None
+        sentence_done = text.endswith(SENTENCE_END)
+        if elapsed is not None:
+            close = (elapsed >= window_seconds and sentence_done) or elapsed >= 2 * window_seconds
+        else:
+            close = sentence_done and length >= MAX_PARAGRAPH_CHARS // 2
+        if close or length >= MAX_PARAGRAPH_CHARS:
+            yield start, texts, consumed
+            texts = []
+            length = 0
+
+    if texts:
+        yield start, texts, consumed
+
+
+def build_story(transcript_text, body_style, heading_style=None, window_seconds: float = 60.0, calback_func=None, timings=None,
+                dedupe: bool = True, sentences: bool = False):
+    """
+    #! Lazily yields one flowable per paragraph (plus optional timestamp headings)
+    #? Layout progress between 0.3 and 0.95 is reported as paragraphs are consumed.
+    #? Time spent creating flowables is added to timings["story_seconds"].
+    """
+    try:
+        total = len(transcript_text)
+    except TypeError:
+        total = 0  #? Plain iterators have no length, progress is then not reported
+    reported = 0.3
+    spent = 0.0
+
+    started = time.perf_counter()
+    for start, texts, consumed in group_segments(transcript_text, window_seconds, True, dedupe, sentences):
+        if heading_style is not None and start is not None:
+            heading = Paragraph(format_timestamp(start), heading_style)
+            spent += time.perf_counter() - started
+            yield heading
+            started = time.perf_counter()
+        paragraph = Paragraph(" ".join(texts), body_style)  #? Texts are already XML-escaped
+        spent += time.perf_counter() - started
+        if timings is not None:
+            timings["story_seconds"] = round(spent, 4)
+        yield paragraph
+        started = time.perf_counter()
+
+        if calback_func and total:
+            value = 0.3 + 0.65 * consumed / total
+            if value - reported >= 0.05:  #? Keeps progress traffic low on long transcripts
+                reported = value
+                calback_func(value, "Pdf Creating . . .")
+
+
+def draw_transcript(writer: CanvasWriter, transcript_text, timestamps: bool = False, window_seconds: float = 60.0,
+                    calback_func=None, dedupe: bool = True, sentences: bool = False):
+    #! Draws the paragraphs of one transcript with a CanvasWriter (same grouping as build_story)
+    try:
+        total = len(transcript_text)
+    except TypeError:
+        total = 0
+    reported = 0.3
+
+    for start, texts, consumed in group_segments(transcript_text, window_seconds, False, dedupe, sentences):
+        body = writer.wrap(" ".join(texts), BODY_STYLE)
+        if timestamps and start is not None:
+            #? keepWithNext: the heading moves to the next page together with its paragraph
+            reserve = max(TIMESTAMP_STYLE.space_after, BODY_STYLE.space_before) + len(body) * BODY_STYLE.leading
+            writer.paragraph(format_timestamp(start), TIMESTAMP_STYLE, reserve)
+        writer.draw(body, BODY_STYLE)
+
+        if calback_func and total:
+            value = 0.3 + 0.65 * consumed / total
+            if value - reported >= 0.05:
+                reported = value
+                calback_func(value, "Pdf Creating . . .")
+
+
+def render_canvas(pdf_file: str, font_name: str, transcript_text, timestamps: bool = False, window_seconds: float = 60.0,
+                  calback_func=None, timings=None, dedupe: bool = True, sentences: bool = False):
+    #! Canvas renderer - same paragraphs as build_story, drawn without platypus
+    writer = CanvasWriter(pdf_file, font_name)
+    draw_transcript(writer, transcript_text, timestamps, window_seconds, calback_func, dedupe, sentences)
+    writer.save()
+    if timings is not None:
+        timings["pages"] = writer.page
+
+
+def create_pdf(video_title: str, transcript_text, output_dir="", calback_func=None, timestamps: bool = False, window_seconds: float = 60.0, timings=None, engine: str = "platypus",
+               dedupe: bool = True, sentences: bool = False, memoize: bool = True):
     #! Function that generates a PDF file using the transcript text
     """
     PDF oluşturur.
@@ -16,14 +188,19 @@ def create_pdf(video_title: str, transcript_text, output_dir="", calback_func=No
         transcript_text: PDF içinde yazılacak metin
         output_dir: PDF'in kaydedileceği klasör (opsiyonel)
         calback : geri dönüşümlü function
-    
+        timestamps: her paragrafın önüne zaman damgası başlığı ekler
+        window_seconds: bir paragrafta toplanan yaklaşık konuşma süresi
+        timings: verilirse aşama süreleri ve dosya boyutu bu sözlüğe yazılır
+        engine: "platypus" (tam yerleşim) veya "canvas" (hızlı, düz metin)
+        dedupe: otomatik altyazılarda tekrarlanan metin parçalarını atar
+        sentences: metni cümle sonlarına göre yeniden böler
+        memoize: aynı metin ve ayarlarla üretilmiş PDF klasörde duruyorsa yeniden oluşturmaz
+
     Returns:
         PDF dosya adı (tam yol)
     """
 
-    #? Preparing transcript placeholder
-    new_transcript_text = ""
-    calback_func(0.2, "Pdf Creating . . .") # type: ignore
+    calback_func(0.1, "Pdf Creating . . .") # type: ignore
 
     #! Generate a safe filename using allowed characters only
     safe_chars = set('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789 -_.')
@@ -31,39 +208,62 @@ def create_pdf(video_title: str, transcript_text, output_dir="", calback_func=No
     if len(file_name_safe) > 100:
         file_name_safe = file_name_safe[:100]
 
-    calback_func(0.4, "Pdf Creating . . .") # type: ignore
-
     #? Final PDF path creation
     pdf_file = os.path.join(output_dir, f"{file_name_safe}.pdf")
 
-    #! Creating the PDF document with margins
-    doc = SimpleDocTemplate(pdf_file, pagesize=A4, rightMargin=50, leftMargin=50, topMargin=50, bottomMargin=50)
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown PDF engine: {engine}")
 
-    #? Default font name
-    font_name = 'Helvetica'
+    if timings is None:
+        timings = {}
 
-    #! Paths to check for font availability
-    font_paths = [
-        'assets/fonts/arial.ttf',  # project-level font
-        'assets/fonts/Arial.ttf',
-        r'C:\\Windows\\Fonts\\arial.ttf',
-        '/Library/Fonts/Arial.ttf',
-    ]
+    #? Font is parsed and registered once per process
+    started = time.perf_counter()
+    font_name = get_font_name()
+    timings["font_seconds"] = round(time.perf_counter() - started, 4)
 
-    #? Attempt to load a custom font (Arial) if available
-    try:
-        for font_path in font_paths:
-            if os.path.exists(font_path):
-                pdfmetrics.registerFont(TTFont('Arial', font_path))
-                font_name = 'Arial'
-                break
-    except Exception as e:
-        print(f"Font load error, using default: {e}")
+    #? An output rendered earlier from the same transcript and options is left as it is
+    manifest = key = None
+    if memoize:
+        started = time.perf_counter()
+        transcript_text = Transcript.from_entries(transcript_text)
+        manifest = manifest_for(output_dir)
+        key = render_key(transcript_text, version=RENDER_VERSION, title=video_title, font=font_name, engine=engine,
+                         timestamps=timestamps, window_seconds=window_seconds, dedupe=dedupe, sentences=sentences)
+        entry = manifest.lookup(os.path.basename(pdf_file), key)
+        timings["hash_seconds"] = round(time.perf_counter() - started, 4)
+        if entry is not None:
+            timings["unchanged"] = True
+            timings["pages"] = entry.get("pages")
+            timings["output_bytes"] = entry["bytes"]
+            calback_func(1.0, "Pdf Unchanged") # type: ignore
+            return pdf_file
 
-    calback_func(0.7, "text convertations . . .") # type: ignore
+    calback_func(0.2, "text convertations . . .") # type: ignore
 
-    #! Combining all transcript text into a single string
-    new_transcript_text = " ".join(entry["text"] for entry in transcript_text)
+    #! Rendered into a temp file that replaces the PDF once complete - no truncated output on failure
+    with atomic_output(pdf_file) as tmp_file:
+        if engine == "canvas":
+            calback_func(0.3, "Pdf Creating . . .") # type: ignore
+            started = time.perf_counter()
+            render_canvas(tmp_file, font_name, transcript_text, timestamps, window_seconds, calback_func, timings, dedupe,
+                          sentences)
+            timings["doc_build_seconds"] = round(time.perf_counter() - started, 4)
+        else:
+            _render_platypus(tmp_file, font_name, transcript_text, timestamps, window_seconds, calback_func, timings,
+                             dedupe, sentences)
+    timings["output_bytes"] = os.path.getsize(pdf_file)
+    if manifest is not None:
+        manifest.record(os.path.basename(pdf_file), key, bytes=timings["output_bytes"], pages=timings.get("pages"))
+    calback_func(1.0, "Pdf Created") # type: ignore
+    return pdf_file
+
+
+def _render_platypus(pdf_file: str, font_name: str, transcript_text, timestamps: bool, window_seconds: float,
+                     calback_func, timings: dict, dedupe: bool, sentences: bool):
+    #! Platypus renderer - full layout with styled paragraphs
+    #? Creating the PDF document with margins
+    doc = SimpleDocTemplate(pdf_file, pagesize=A4, rightMargin=50, leftMargin=50, topMargin=50, bottomMargin=50)
 
     #? PDF text style configuration
     styles = getSampleStyleSheet()
@@ -71,13 +271,29 @@ def create_pdf(video_title: str, transcript_text, output_dir="", calback_func=No
     normal_style.fontName = font_name
     normal_style.fontSize = 11
     normal_style.leading = 14
+    normal_style.spaceAfter = 8
+
+    heading_style = None
+    if timestamps:
+        heading_style = ParagraphStyle(
+            "Timestamp",
+            parent=normal_style,
+            fontSize=9,
+            leading=12,
+            textColor="#008080",
+            spaceBefore=4,
+            spaceAfter=2,
+            keepWithNext=1,
+        )
 
-    calback_func(0.9, "Pdf Creating . . .") # type: ignore
+    calback_func(0.3, "Pdf Creating . . .") # type: ignore
 
-    #! Building PDF structure
-    story = []
-    story.append(Paragraph(new_transcript_text.replace("\n", "<br/>"), normal_style))
+    #! Building PDF structure - one flowable per paragraph, generated during layout
+    story = _LazyStory(build_story(transcript_text, normal_style, heading_style, window_seconds, calback_func, timings,
+                                   dedupe, sentences))
 
-    #? Saving the PDF to disk
+    #? Saving the PDF to disk - story creation happens during the build, so it is subtracted
+    started = time.perf_counter()
     doc.build(story)
-    calback_func(1.0, "Pdf Created") # type: ignore
+    timings["doc_build_seconds"] = round(time.perf_counter() - started - timings.get("story_seconds", 0.0), 4)
+    timings["pages"] = doc.page
@@ -0,0 +1,170 @@
+import asyncio
+import cProfile
+import functools
+import itertools
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+
+class RenderCancelled(Exception):
+    #? Raised inside a worker when its task was cancelled during rendering
+    pass
+
+
+def _profiled_render(video_title: str, transcript, output_dir: str, report, pdf_options: dict, profile_path):
+    #! Renders one PDF, returns (pdf path, stage timings)
+    #? With a profile_path the render runs under cProfile and the stats are dumped there
+    from services.pdf_generate import create_pdf  #? reportlab is loaded by the renderer, not by importing the pool
+    timings = {}
+    profiler = cProfile.Profile() if profile_path else None
+    try:
+        if profiler:
+            profiler.enable()
+        pdf_file = create_pdf(video_title, transcript_text=transcript, output_dir=output_dir, calback_func=report,
+                              timings=timings, **pdf_options)
+        return pdf_file, timings
+    finally:
+        if profiler:
+            profiler.disable()
+            profiler.dump_stats(profile_path)
+
+
+def _init_worker():
+    #? Worker initializer - loads reportlab and the font once per process
+    from services import fonts
+    import services.pdf_generate  #? Imported now so the first render does not pay for it
+    fonts.warm_up()
+
+
+def _render_job(job_id: int, video_title: str, transcript, output_dir: str, pdf_options: dict, profile_path,
+                progress_queue, cancelled):
+    #! Runs in a worker process - renders one PDF and reports progress through the queue
+    def report(value: float, text: str):
+        #? Each progress point doubles as a cancellation checkpoint
+        if job_id in cancelled:
+            raise RenderCancelled()
+        progress_queue.put((job_id, value, text))
+
+    try:
+        return _profiled_render(video_title, transcript, output_dir, report, pdf_options, profile_path)
+    finally:
+        progress_queue.put((job_id, None, None))  #? Tells the pump that no more progress will follow
+
+
+class PdfRenderPool:
+    """
+    #! Renders PDFs in a pool of worker processes
+    #? Keeps reportlab layout off the Flet event loop and spreads large batches
+    #? over several cores. With workers=0 rendering falls back to a background thread.
+    """
+
+    def __init__(self, workers: int = 2):
+        self.workers = workers
+        self._executor = None
+        self._manager = None
+        self._progress = None  #? Worker -> app progress messages
+        self._cancelled = None  #? Shared job IDs whose render must stop
+        self._callbacks = {}  #? job_id -> (event loop, progress callback)
+        self._ids = itertools.count()
+        self._pump_thread = None
+        self._start_lock = threading.Lock()  #? warm_up starts the pool from a worker thread while render may start it on the loop
+
+    def _start(self):
+        #? Worker processes are only spawned on first use
+        with self._start_lock:
+            if self._executor is not None:
+                return
+            self._manager = multiprocessing.Manager()
+            self._progress = self._manager.Queue()
+            self._cancelled = self._manager.dict()
+            self._pump_thread = threading.Thread(target=self._pump, args=(self._progress,), daemon=True)
+            self._pump_thread.start()
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)  #? Each worker loads the font once
+
+    def _pump(self, progress):
+        #! Forwards worker progress to the callbacks on their event loops
+        while True:
+            try:
+                item = progress.get()
+            except (EOFError, OSError):
+                break  #? Manager was shut down
+            if item is None:
+                break
+            job_id, value, text = item
+            if value is None:
+                self._callbacks.pop(job_id, None)
+                continue
+            entry = self._callbacks.get(job_id)
+            if entry:
+                loop, callback = entry
+                loop.call_soon_threadsafe(callback, value, text)
+
+    def warm_up(self):
+        #! Starts the worker processes ahead of the first render (blocking, run it off the UI thread)
+        #? With workers=0 the font is loaded in this process instead
+        if self.workers <= 0:
+            _init_worker()
+            return
+        self._start()
+        for future in [self._executor.submit(int) for _ in range(self.workers)]:  #? One trivial job per worker spawns them all
+            future.result()
+
+    async def render(self, video_title: str, transcript, output_dir: str = "", calback_func=None, metrics=None,
+                     profile_path: str | None = None, **pdf_options):
+        #! Renders a PDF without blocking the event loop and returns its path
+        #? Extra keyword arguments are passed to create_pdf (timestamps, window_seconds).
+        #? Stage timings go to `metrics`, a cProfile dump to `profile_path` if given.
+        loop = asyncio.get_running_loop()
+        callback = calback_func or (lambda value, text: None)
+
+        if self.workers <= 0:
+            #? Thread fallback - progress is marshalled back onto the loop
+            def report(value: float, text: str):
+                loop.call_soon_threadsafe(callback, value, text)
+            job = functools.partial(_profiled_render, video_title, transcript, output_dir, report, pdf_options, profile_path)
+            pdf_file, timings = await asyncio.to_thread(job)
+            if metrics is not None:
+                metrics.update(timings)
+            return pdf_file
+
+        self._start()
+        job_id = next(self._ids)
+        self._callbacks[job_id] = (loop, callback)
+        future = self._executor.submit(_render_job, job_id, video_title, transcript, output_dir, pdf_options, profile_path,
+                                      self._progress, self._cancelled)
+        future.add_done_callback(lambda f: self._forget(job_id))
+        try:
+            pdf_file, timings = await asyncio.wrap_future(future)
+            if metrics is not None:
+                metrics.update(timings)
+            return pdf_file
+        except asyncio.CancelledError:
+            #! A pending render is skipped, a running one stops at its next progress point
+            if not future.done():
+                self._cancelled[job_id] = True
+            self._callbacks.pop(job_id, None)
+            raise
+
+    def _forget(self, job_id: int):
+        #? Drops the cancellation flag once the job is finished
+        try:
+            self._cancelled.pop(job_id, None)
+        except (EOFError, OSError):
+            pass
+
+    def shutdown(self):
+        #! Stops worker processes, call once when the app shuts down
+        with self._start_lock:
+            if self._executor is not None:
+                workers = list((self._executor._processes or {}).values())
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                for process in workers:  #? Renders still in progress are not waited for
+                    process.terminate()
+                try:
+                    self._progress.put(None)
+                except (EOFError, OSError):
+                    pass
+                self._manager.shutdown()
+            self._executor = None
+            self._manager = None
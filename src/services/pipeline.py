@@ -0,0 +1,254 @@
+import asyncio
+import logging
+import os
+import sqlite3
+import time
+from services.settings_manager import SettingsManager
+from services.transcript import TranscriptClient
+from services.transcript_cache import TranscriptCache
+from services.pdf_pool import PdfRenderPool
+from services.app_paths import app_data_dir
+from services.metrics import MetricsWriter, TaskMetrics
+from services.single_flight import SingleFlight
+from services.search_index import SearchIndex
+
+#? Identical conversions running at the same time share one fetch and one render
+_conversions = SingleFlight()
+
+
+def search_index_path() -> str:
+    #? Index database shared by the app and the CLI
+    return os.path.join(app_data_dir("index"), "transcripts.sqlite3")
+
+
+def create_search_index(setting: SettingsManager, path: str | None = None) -> SearchIndex | None:
+    #! Full-text index of fetched transcripts, None when indexing is disabled in settings
+    #? The index is optional - a database that cannot be opened only turns indexing off
+    if not setting.get_search_index_enabled():
+        return None
+    path = path or search_index_path()
+    try:
+        return SearchIndex(path)
+    except sqlite3.Error as e:
+        logging.getLogger(__name__).warning("Search index %s unavailable, transcripts are not indexed: %s", path, e)
+        return None
+
+
+def create_client(setting: SettingsManager, index: SearchIndex | None = None) -> TranscriptClient:
+    #! Builds the pooled transcript client (with its on-disk cache) from settings
+    #? Transcripts it returns are added to `index` when one is given
+    cache = TranscriptCache(
+        app_data_dir("transcripts"),
+        ttl=setting.get_transcript_cache_ttl_days() * 24 * 3600,
+        max_bytes=int(setting.get_transcript_cache_max_mb() * 1024 * 1024),
+    )
+    return TranscriptClient(
+        limit_per_host=setting.get_http_connections_per_host(),
+        cache=cache,
+        requests_per_second=setting.get_api_requests_per_second(),
+        max_retries=setting.get_api_max_retries(),
+        url=setting.get_api_url() or None,
+        index=index,
+    )
+
+
+def create_metrics_writer(setting: SettingsManager, path: str | None = None) -> MetricsWriter | None:
+    #! Metrics JSONL writer, None when metrics are disabled in settings
+    if not setting.get_metrics_enabled():
+        return None
+    return MetricsWriter(path or os.path.join(app_data_dir("metrics"), "metrics.jsonl"))
+
+
+async def convert_video(video_id: str, setting: SettingsManager, client: TranscriptClient, renderer: PdfRenderPool,
+                        output_dir: str | None = None, calback_func=None, use_cache: bool | None = None,
+                        metrics_writer: MetricsWriter | None = None, on_stage=None, engine: str | None = None,
+                        memoize: bool | None = None) -> str:
+    """
+    #! Fetches one transcript and renders it to PDF
+    #? Shared by the Flet UI and the headless CLI, returns the PDF path.
+    #? Stage timings of the task are appended to `metrics_writer` when given.
+    #? A call identical to one already running (same video and output settings) joins it.
+    #? on_stage("fetching" / "rendering") is called as the task moves through the pipeline.
+    #? `engine` picks the PDF renderer for this task, default is the pdf_engine setting.
+    #? `memoize` keeps an unchanged PDF instead of rendering it again, default is the pdf_skip_unchanged setting.
+    """
+    metrics = TaskMetrics(video_id)
+    output_dir = output_dir or setting.get_download_path()
+    engine = engine or setting.get_pdf_engine()
+    if memoize is None:
+        memoize = setting.get_pdf_skip_unchanged()
+    metrics.set("engine", engine)
+    key = (video_id, os.path.abspath(output_dir) if output_dir else None,
+           setting.get_pdf_timestamps(), setting.get_pdf_paragraph_seconds(), engine,
+           setting.get_pdf_dedupe_captions(), setting.get_pdf_rebuild_sentences(), memoize)
+    if _conversions.is_running(key):
+        metrics.set("coalesced", True)
+    try:
+        pdf_file = await _conversions.do(
+            key, lambda: _convert(video_id, setting, client, renderer, output_dir, calback_func, use_cache, metrics, on_stage,
+                                  engine, memoize)
+        )
+    except asyncio.CancelledError:
+        if metrics_writer:
+            metrics_writer.write(metrics.finish("cancelled"))
+        raise
+    except Exception as e:
+        if metrics_writer:
+            metrics_writer.write(metrics.finish("failed", str(e) or type(e).__name__))
+        raise
+    if metrics_writer:
+        metrics_writer.write(metrics.finish("done"))
+    return pdf_file
+
+
+async def _convert(video_id: str, setting: SettingsManager, client: TranscriptClient, renderer: PdfRenderPool,
+                   output_dir: str | None, calback_func, use_cache: bool | None, metrics: TaskMetrics, on_stage=None,
+                   engine: str = "platypus", memoize: bool = True) -> str:
+    api_key = setting.get_api_key()
+    if not api_key:
+        raise ValueError("API key is not configured")
+
+    if not output_dir:
+        raise ValueError("Download folder is not configured")
+
+    if use_cache is None:
+        use_cache = setting.get_transcript_cache_enabled()
+
+    def on_retry(attempt: int, delay: float, error: Exception):
+        #? Shows the pending retry in the task card / log
+        if calback_func:
+            calback_func(0.1, f"Retry {attempt} in {delay:.0f}s - {error}")
+
+    #? Transcript is retrieved from API (or the cache)
+    if on_stage:
+        on_stage("fetching")
+    with metrics.stage("fetch"):
+        transcript = await client.get_transcript(video_id, api=api_key, use_cache=use_cache, on_retry=on_retry,
+                                                 metrics=metrics)
+    metrics.set("entries", len(transcript))
+
+    #? Optional cProfile dump of the render, one file per task
+    profile_path = None
+    if setting.get_metrics_profile():
+        profile_path = os.path.join(app_data_dir("metrics", "profiles"), f"{video_id}-{int(time.time())}.prof")
+
+    #? PDF is created in a worker process
+    if on_stage:
+        on_stage("rendering")
+    with metrics.stage("render"):
+        return await renderer.render(
+            video_id,
+            transcript=transcript,
+            calback_func=calback_func,
+            output_dir=output_dir,
+            metrics=metrics,
+            profile_path=profile_path,
+            timestamps=setting.get_pdf_timestamps(),
+            window_seconds=setting.get_pdf_paragraph_seconds(),
+            engine=engine,
+            dedupe=setting.get_pdf_dedupe_captions(),
+            sentences=setting.get_pdf_rebuild_sentences(),
+            memoize=memoize,
+        )
+
+
+async def convert_digest(video_ids: list, setting: SettingsManager, client: TranscriptClient, output_path: str,
+                         title: str = "Transcripts", calback_func=None, use_cache: bool | None = None,
+                         metrics_writer: MetricsWriter | None = None, on_section=None, include=None,
+                         jobs: int | None = None) -> dict:
+    """
+    #! Fetches several transcripts and renders them into one PDF
+    #? Transcripts are fetched `jobs` (default max_concurrent_tasks) at a time and each one is
+    #? written as a section as soon as it arrives, one section at a time.
+    #? calback_func(video_id, value, text) reports progress per video,
+    #? on_section(video_id, error) is called when a video is written (error None) or failed,
+    #? include(video_id) may drop a video (e.g. removed from the queue) before it is written.
+    #? Returns {video_id: error or None}.
+    """
+    from services.pdf_digest import DigestWriter  #? reportlab is only needed here when a digest is built
+
+    api_key = setting.get_api_key()
+    if not api_key:
+        raise ValueError("API key is not configured")
+    if use_cache is None:
+        use_cache = setting.get_transcript_cache_enabled()
+
+    video_ids = list(dict.fromkeys(video_ids))
+    results = {}
+    slots = asyncio.Semaphore(jobs or setting.get_max_concurrent_tasks())
+    write_lock = asyncio.Lock()  #? The document is written by one section at a time
+    digest = await asyncio.to_thread(DigestWriter, output_path, title, len(video_ids))
+
+    def report(video_id: str):
+        if calback_func is None:
+            return None
+        loop = asyncio.get_running_loop()
+        #? Section rendering runs in a worker thread, progress is marshalled back onto the loop
+        return lambda value, text: loop.call_soon_threadsafe(calback_func, video_id, value, text)
+
+    async def add(video_id: str):
+        metrics = TaskMetrics(video_id)
+        metrics.set("engine", "digest")
+        try:
+            async with slots:
+                if calback_func:
+                    calback_func(video_id, 0.1, "API response awaited . . . ")
+                with metrics.stage("fetch"):
+                    transcript = await client.get_transcript(video_id, api=api_key, use_cache=use_cache,
+                                                             metrics=metrics)
+            metrics.set("entries", len(transcript))
+            async with write_lock:
+                if include and not include(video_id):
+                    results[video_id] = "Removed"
+                    if metrics_writer:
+                        metrics_writer.write(metrics.finish("cancelled"))
+                    return
+                with metrics.stage("render"):
+                    await asyncio.to_thread(digest.add_section, video_id, transcript, setting.get_pdf_timestamps(),
+                                            setting.get_pdf_paragraph_seconds(), report(video_id),
+                                            setting.get_pdf_dedupe_captions(), setting.get_pdf_rebuild_sentences())
+        except asyncio.CancelledError:
+            if metrics_writer:
+                metrics_writer.write(metrics.finish("cancelled"))
+            raise
+        except Exception as e:
+            results[video_id] = str(e) or type(e).__name__
+            if metrics_writer:
+                metrics_writer.write(metrics.finish("failed", results[video_id]))
+            if on_section:
+                on_section(video_id, results[video_id])
+            return
+        results[video_id] = None
+        if metrics_writer:
+            metrics_writer.write(metrics.finish("done"))
+        if on_section:
+            on_section(video_id, None)
+
+    await asyncio.gather(*(add(video_id) for video_id in video_ids))
+    if not digest.sections:
+        raise ValueError("No transcript could be added to the digest")
+    await asyncio.to_thread(digest.close)
+    return results
+
+
+async def convert_search(index: SearchIndex, hits: list, output_path: str, title: str = "Search results",
+                         context: int = 1) -> str:
+    """
+    #! Renders the segments around search hits into one PDF, straight from the index (no API call)
+    #? Every video is a section, every run of adjacent segments a paragraph under its timestamp.
+    #? `context` segments before and after each hit are included. Returns the PDF path.
+    """
+    from services.pdf_digest import DigestWriter  #? reportlab is only needed here when results are exported
+
+    clips = await asyncio.to_thread(index.clips, hits, context)
+    if not clips:
+        raise ValueError("No search results to export")
+
+    def render() -> str:
+        digest = DigestWriter(output_path, title, len(clips))
+        for video_id, transcript in clips.items():
+            #? window 0 closes a paragraph after every clip, text is already normalized in the index
+            digest.add_section(video_id, transcript, timestamps=True, window_seconds=0, dedupe=False)
+        return digest.close()
+
+    return await asyncio.to_thread(render)
@@ -0,0 +1,41 @@
+import asyncio
+import time
+
+
+class TokenBucket:
+    """
+    #! Client-side token bucket rate limiter
+    #? Allows `rate` requests per second on average with bursts of up to `capacity`.
+    #? pause() blocks every caller for a while, e.g. after the API answered 429.
+    """
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        self.rate = rate  #? Tokens added per second, 0 or less disables limiting
+        self.capacity = capacity or max(1.0, rate)  #? Largest burst allowed
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()  #? Waiters are served in arrival order
+
+    async def acquire(self):
+        #! Waits until a request may be sent
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+
+                #? Refill tokens for the time passed since the last call
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def pause(self, seconds: float):
+        #? Holds back all callers for `seconds` (server asked us to slow down)
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
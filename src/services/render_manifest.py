@@ -0,0 +1,115 @@
+import hashlib
+import json
+import os
+import threading
+from services.atomic_files import FileLock, atomic_output
+from services.transcript_stream import Transcript
+
+#? Manifest file kept in every output folder
+MANIFEST_NAME = ".transcriptor-manifest.jsonl"
+
+#? Superseded lines tolerated before the manifest is rewritten
+COMPACT_AFTER = 1000
+
+
+def render_key(transcript: Transcript, **options) -> str:
+    #! Hash of everything a PDF depends on - transcript text, start times and render options
+    #? Normalization is deterministic, so the raw text plus its options (dedupe, sentences) stands
+    #? in for the normalized text without running it. Durations are not used by the layout.
+    digest = hashlib.sha256(json.dumps(options, sort_keys=True, ensure_ascii=False).encode("utf-8"))
+    digest.update("\0".join(transcript.texts).encode("utf-8", "surrogatepass"))
+    digest.update(transcript.starts.tobytes())
+    return digest.hexdigest()
+
+
+class RenderManifest:
+    """
+    #! Render keys of the PDFs in one output folder, kept in an append-only JSONL file
+    #? One line {"file", "key", "bytes", "pages"} per written PDF, the last line of a file
+    #? wins. Processes append under a file lock and only read the lines added since their
+    #? last look, so checking thousands of unchanged outputs costs one read of the file.
+    """
+
+    def __init__(self, output_dir: str, compact_after: int = COMPACT_AFTER):
+        self.output_dir = output_dir
+        self.path = os.path.join(output_dir, MANIFEST_NAME)
+        self.compact_after = compact_after
+        self.entries = {}  #? file name -> latest entry
+        self._lines = 0  #? Lines read, superseded ones included
+        self._offset = 0  #? Bytes of the file already read
+        self._inode = None  #? Compaction replaces the file, which starts a full re-read
+        self._lock = threading.Lock()  #? The thread fallback renders from several threads
+
+    def _refresh(self):
+        #? Reads the lines appended (by any process) since the last call
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            self.entries, self._lines, self._offset, self._inode = {}, 0, 0, None
+            return
+        if stat.st_ino != self._inode or stat.st_size < self._offset:
+            self.entries, self._lines, self._offset, self._inode = {}, 0, 0, stat.st_ino
+        if stat.st_size == self._offset:
+            return
+        with open(self.path, 'rb') as f:
+            f.seek(self._offset)
+            data = f.read(stat.st_size - self._offset)
+        end = data.rfind(b"\n") + 1  #? A line still being appended is read next time
+        for line in data[:end].splitlines():
+            try:
+                entry = json.loads(line)
+                self.entries[entry["file"]] = entry
+            except (ValueError, KeyError, TypeError):
+                continue  #? Torn line after a crash
+            self._lines += 1
+        self._offset += end
+
+    def lookup(self, file_name: str, key: str) -> dict | None:
+        #! Entry of an unchanged output - same key, and the file still has the size it was written with
+        with self._lock:
+            self._refresh()
+            entry = self.entries.get(file_name)
+        if entry is None or entry.get("key") != key:
+            return None
+        try:
+            size = os.path.getsize(os.path.join(self.output_dir, file_name))
+        except OSError:
+            return None
+        return entry if size == entry.get("bytes") else None
+
+    def record(self, file_name: str, key: str, **fields):
+        #! Appends the key of a freshly written output
+        line = json.dumps({"file": file_name, "key": key, **fields}, ensure_ascii=False) + "\n"
+        with self._lock, FileLock(f"{self.path}.lock"):
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line)
+            self._refresh()
+            if self._lines - len(self.entries) >= self.compact_after:
+                self._compact()
+
+    def _compact(self):
+        #? Rewrites the manifest with one line per output that still exists (lock held)
+        self.entries = {
+            name: entry for name, entry in self.entries.items()
+            if os.path.exists(os.path.join(self.output_dir, name))
+        }
+        with atomic_output(self.path) as tmp_path:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                for entry in self.entries.values():
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        stat = os.stat(self.path)
+        self._lines, self._offset, self._inode = len(self.entries), stat.st_size, stat.st_ino
+
+
+_manifests = {}
+_manifests_lock = threading.Lock()
+
+
+def manifest_for(output_dir: str) -> RenderManifest:
+    #! Manifest of an output folder, one instance per folder and process
+    directory = os.path.abspath(output_dir or ".")
+    with _manifests_lock:
+        manifest = _manifests.get(directory)
+        if manifest is None:
+            manifest = _manifests[directory] = RenderManifest(directory)
+        return manifest
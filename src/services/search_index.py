@@ -0,0 +1,158 @@
+import collections
+import sqlite3
+import threading
+import time
+from services.render_manifest import render_key
+from services.text_normalize import normalize_segments
+from services.transcript_stream import Transcript
+
+#? One search result - `snippet` is the matching text with the hit terms wrapped in the marks
+SearchHit = collections.namedtuple("SearchHit", "video_id seq start_ms text snippet")
+
+#? Words of context around a hit in its snippet
+SNIPPET_WORDS = 16
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS videos (
+    video_id TEXT PRIMARY KEY,
+    key TEXT NOT NULL,
+    segments INTEGER NOT NULL,
+    indexed_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS segments (
+    id INTEGER PRIMARY KEY,
+    video_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    start_ms INTEGER,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS segments_video ON segments (video_id, seq);
+CREATE VIRTUAL TABLE IF NOT EXISTS segments_fts USING fts5 (
+    text, content='segments', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS segments_ai AFTER INSERT ON segments BEGIN
+    INSERT INTO segments_fts (rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS segments_ad AFTER DELETE ON segments BEGIN
+    INSERT INTO segments_fts (segments_fts, rowid, text) VALUES ('delete', old.id, old.text);
+END;
+"""
+
+
+def format_ms(milliseconds: int | None) -> str:
+    #? 3725400 -> "01:02:05.400", None -> "--:--:--"
+    if milliseconds is None:
+        return "--:--:--"
+    seconds, millis = divmod(int(milliseconds), 1000)
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}.{millis:03d}"
+
+
+def match_query(query: str) -> str:
+    #! Turns free text into an FTS5 query - every word must appear, a trailing * keeps prefix search
+    terms = []
+    for word in query.split():
+        prefix = word.endswith("*") and len(word) > 1
+        word = word.rstrip("*")
+        if word:
+            terms.append('"' + word.replace('"', '""') + '"' + ("*" if prefix else ""))
+    return " ".join(terms)
+
+
+class SearchIndex:
+    """
+    #! Local full-text index of every fetched transcript (SQLite FTS5)
+    #? Transcripts are stored as their normalized segments (same clean-up as the PDF)
+    #? with start times in milliseconds. A video is re-indexed only when its transcript
+    #? changed. The database runs in WAL mode, so the app and headless runs can share it.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()  #? One connection, used from the event loop's worker threads
+        self._db = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        try:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.executescript(_SCHEMA)
+        except sqlite3.Error:
+            self._db.close()  #? Not a usable database (locked, read-only, not SQLite)
+            raise
+
+    def add(self, video_id: str, transcript) -> bool:
+        #! Indexes one transcript, returns False when the same transcript is already indexed
+        transcript = Transcript.from_entries(transcript)
+        key = render_key(transcript)
+        with self._lock:
+            row = self._db.execute("SELECT key FROM videos WHERE video_id = ?", (video_id,)).fetchone()
+        if row and row[0] == key:
+            return False
+
+        rows = [
+            (video_id, seq, None if start is None else round(start * 1000), text)
+            for seq, (text, start, _) in enumerate(normalize_segments(transcript))
+        ]
+        with self._lock, self._db:  #? One transaction - searches never see half a video
+            self._db.execute("DELETE FROM segments WHERE video_id = ?", (video_id,))
+            self._db.executemany("INSERT INTO segments (video_id, seq, start_ms, text) VALUES (?, ?, ?, ?)", rows)
+            self._db.execute("INSERT OR REPLACE INTO videos VALUES (?, ?, ?, ?)", (video_id, key, len(rows), time.time()))
+        return True
+
+    def search(self, query: str, limit: int = 50, video_id: str | None = None, marks: tuple = ("[", "]")) -> list:
+        #! Best matching segments first, as SearchHit tuples (empty for a query without words)
+        match = match_query(query)
+        if not match:
+            return []
+        sql = ("SELECT s.video_id, s.seq, s.start_ms, s.text, snippet(segments_fts, 0, ?, ?, '…', ?) "
+               "FROM segments_fts JOIN segments s ON s.id = segments_fts.rowid WHERE segments_fts MATCH ?")
+        params = [marks[0], marks[1], SNIPPET_WORDS, match]
+        if video_id:
+            sql += " AND s.video_id = ?"
+            params.append(video_id)
+        sql += " ORDER BY rank LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            return [SearchHit(*row) for row in self._db.execute(sql, params)]
+
+    def clips(self, hits: list, context: int = 1) -> dict:
+        #! Transcript excerpts around the hits, read from the index only
+        #? Returns {video_id: Transcript}, one entry per run of adjacent segments (hits plus
+        #? `context` segments on each side), in video order of first appearance and time order.
+        wanted = {}
+        for hit in hits:
+            wanted.setdefault(hit.video_id, set()).update(range(max(0, hit.seq - context), hit.seq + context + 1))
+
+        clips = {}
+        with self._lock:
+            for video_id, seqs in wanted.items():
+                transcript = Transcript()
+                texts, start, last = [], None, None
+                low, high = min(seqs), max(seqs)
+                rows = self._db.execute(
+                    "SELECT seq, start_ms, text FROM segments WHERE video_id = ? AND seq BETWEEN ? AND ? ORDER BY seq",
+                    (video_id, low, high),
+                )
+                for seq, start_ms, text in rows:
+                    if seq not in seqs:
+                        continue
+                    if texts and seq != last + 1:
+                        transcript.append(" ".join(texts), start)
+                        texts = []
+                    if not texts:
+                        start = None if start_ms is None else start_ms / 1000
+                    texts.append(text)
+                    last = seq
+                if texts:
+                    transcript.append(" ".join(texts), start)
+                if len(transcript):
+                    clips[video_id] = transcript
+        return clips
+
+    def stats(self) -> dict:
+        #? Indexed videos and segments
+        with self._lock:
+            videos, segments = self._db.execute("SELECT COUNT(*), COALESCE(SUM(segments), 0) FROM videos").fetchone()
+        return {"videos": videos, "segments": segments}
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -1,84 +1,342 @@
+import atexit
 import json
 import os
+import threading
+import time
+from services.atomic_files import FileLock
+
 
 class SettingsManager:
     """
     #! Simple settings manager - API key, download path and auto save
-    #? Manages application configuration and persists settings to JSON file
+    #? Settings live in memory. Setters only mark keys dirty, a debounced flush
+    #? merges them into the file under a lock and replaces it atomically, and
+    #? changes made by other processes are picked up when the file's mtime moves.
     """
     
-    def __init__(self, settings_file: str = "app_settings.json"):
+    def __init__(self, settings_file: str = "app_settings.json", save_delay: float = 0.5, reload_interval: float = 1.0):
         self.settings_file = settings_file
+        self.save_delay = save_delay  #? Seconds setters are coalesced before one write
+        self.reload_interval = reload_interval  #? Seconds between two mtime checks
         #! Default configuration values
         self.default_settings = {
             "api_key": "",
+            "api_url": "",
             "download_path": None,
-            "auto_save": False
+            "auto_save": False,
+            "max_concurrent_tasks": 3,
+            "queue_shortest_first": False,
+            "queue_archive_after": 50,
+            "http_connections_per_host": 8,
+            "transcript_cache_enabled": True,
+            "transcript_cache_ttl_days": 30,
+            "transcript_cache_max_mb": 200,
+            "pdf_workers": 2,
+            "pdf_timestamps": False,
+            "pdf_paragraph_seconds": 60,
+            "pdf_engine": "platypus",
+            "pdf_digest": False,
+            "pdf_dedupe_captions": True,
+            "pdf_rebuild_sentences": False,
+            "pdf_skip_unchanged": True,
+            "search_index_enabled": True,
+            "api_requests_per_second": 2,
+            "api_max_retries": 4,
+            "metrics_enabled": True,
+            "metrics_profile": False
         }
+        self._lock = threading.RLock()  #? Getters and setters run on the event loop and handler threads
+        self._dirty = {}  #? Keys changed in memory but not written yet
+        self._timer = None
+        self._mtime = None  #? mtime_ns of the file the settings were read from
+        self._checked = time.monotonic()
         #? Load existing settings or create default
         self.settings = self.load_settings()
+        atexit.register(self.save_settings)  #? Pending changes are written on exit
+    
+    def _file_mtime(self):
+        try:
+            return os.stat(self.settings_file).st_mtime_ns
+        except OSError:
+            return None
+    
+    def _read_file(self) -> dict:
+        #? Raw file contents, raises OSError / ValueError
+        with open(self.settings_file, 'r', encoding='utf-8') as f:
+            loaded = json.load(f)
+        if not isinstance(loaded, dict):
+            raise ValueError("settings file does not hold an object")
+        return loaded
     
     def load_settings(self) -> dict:
         """
         #! Load settings from file
         #? Reads JSON settings file and merges with defaults for missing keys
         """
+        self._mtime = self._file_mtime()
         try:
-            if os.path.exists(self.settings_file):
-                with open(self.settings_file, 'r', encoding='utf-8') as f:
-                    loaded = json.load(f)
-                    #? Add missing keys from defaults
-                    for key in self.default_settings:
-                        if key not in loaded:
-                            loaded[key] = self.default_settings[key]
-                    return loaded
-            else:
-                #? First time use - save default settings
-                self.save_settings()
-                return self.default_settings.copy()
-        except:
-            #! Return defaults on error
+            loaded = self._read_file()
+        except FileNotFoundError:
+            #? First time use - save default settings
+            self.settings = self.default_settings.copy()
+            self.save_settings(force=True)
+            return self.settings
+        except ValueError:
+            #! Unreadable file is kept aside instead of being overwritten with defaults
+            try:
+                os.replace(self.settings_file, f"{self.settings_file}.corrupt")
+            except OSError:
+                pass
+            return self.default_settings.copy()
+        except OSError:
             return self.default_settings.copy()
+
+        #? Add missing keys from defaults
+        return {**self.default_settings, **loaded}
     
-    def save_settings(self) -> bool:
+    def _maybe_reload(self):
+        #? Picks up changes written by other processes, at most once per reload_interval
+        now = time.monotonic()
+        if now - self._checked < self.reload_interval:
+            return
+        self._checked = now
+        mtime = self._file_mtime()
+        if mtime is None or mtime == self._mtime:
+            return
+        try:
+            loaded = self._read_file()
+        except (OSError, ValueError):
+            return  #? Mid-replace or foreign garbage, keep what we have
+        with self._lock:
+            self._mtime = mtime
+            self.settings = {**self.default_settings, **loaded, **self._dirty}  #? Unsaved local changes win
+    
+    def _get(self, key: str):
+        self._maybe_reload()
+        return self.settings[key]
+    
+    def _set(self, key: str, value):
+        #! Changes one value in memory and schedules a debounced save
+        with self._lock:
+            self.settings[key] = value
+            self._dirty[key] = value
+            if self._timer is None:
+                self._timer = threading.Timer(self.save_delay, self.save_settings)
+                self._timer.daemon = True
+                self._timer.start()
+    
+    def save_settings(self, force: bool = False) -> bool:
         """
         #! Save settings to file
-        #? Writes current settings to JSON file with UTF-8 encoding
+        #? Writes pending changes now: the file is re-read under the lock so keys
+        #? changed by other processes survive, then replaced through a temp file
         """
-        try:
-            with open(self.settings_file, 'w', encoding='utf-8') as f:
-                json.dump(self.settings, f, indent=4, ensure_ascii=False)
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._dirty and not force:
+                return True
+            dirty = dict(self._dirty)
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.settings_file)), exist_ok=True)
+                with FileLock(f"{self.settings_file}.lock"):
+                    try:
+                        current = self._read_file()
+                    except (OSError, ValueError):
+                        current = {}
+                    merged = {**self.default_settings, **current, **(self.settings if force else dirty)}
+                    tmp_path = f"{self.settings_file}.{os.getpid()}.tmp"
+                    with open(tmp_path, 'w', encoding='utf-8') as f:
+                        json.dump(merged, f, indent=4, ensure_ascii=False)
+                        f.flush()
+                        os.fsync(f.fileno())
+                    os.replace(tmp_path, self.settings_file)  #? Readers see the old or the new file, never half of one
+                    self._mtime = self._file_mtime()
+            except OSError:
+                #! Return False on save failure, changes stay pending
+                return False
+            self.settings = merged
+            for key, value in dirty.items():
+                if self._dirty.get(key) == value:
+                    del self._dirty[key]
             return True
-        except:
-            #! Return False on save failure
-            return False
     
     # API Key
     def get_api_key(self) -> str:
         #? Retrieve stored API key
-        return self.settings["api_key"]
+        return self._get("api_key")
     
     def set_api_key(self, api_key: str):
         #! Update API key and save
-        self.settings["api_key"] = api_key
-        self.save_settings()
+        self._set("api_key", api_key)
+    
+    # API Endpoint
+    def get_api_url(self) -> str:
+        #? Transcript API endpoint, empty means the public TranscriptAPI service
+        return self._get("api_url") or ""
+    
+    def set_api_url(self, url: str):
+        #! Update API endpoint and save
+        self._set("api_url", url)
     
     # Download Path
     def get_download_path(self):
         #? Retrieve download directory path
-        return self.settings["download_path"]
+        return self._get("download_path")
     
     def set_download_path(self, path: str):
         #! Update download path and save
-        self.settings["download_path"] = path
-        self.save_settings()
+        self._set("download_path", path)
     
     # Auto Save
     def get_auto_save(self) -> bool:
         #? Check if auto-save is enabled
-        return self.settings["auto_save"]
+        return self._get("auto_save")
     
     def set_auto_save(self, enabled: bool):
         #! Toggle auto-save feature and save
-        self.settings["auto_save"] = enabled
-        self.save_settings()
\ No newline at end of file
+        self._set("auto_save", enabled)
+    
+    # Max Concurrent Tasks
+    def get_max_concurrent_tasks(self) -> int:
+        #? Number of queue tasks allowed to run at the same time
+        return int(self._get("max_concurrent_tasks"))
+    
+    def set_max_concurrent_tasks(self, count: int):
+        #! Update parallel task limit (at least 1) and save
+        self._set("max_concurrent_tasks", max(1, int(count)))
+    
+    # Queue Order
+    def get_queue_shortest_first(self) -> bool:
+        #? Whether waiting tasks with smaller (cached) transcripts start first within a priority
+        return bool(self._get("queue_shortest_first"))
+    
+    def set_queue_shortest_first(self, enabled: bool):
+        #! Toggle shortest-job-first ordering and save
+        self._set("queue_shortest_first", enabled)
+    
+    # Queue Archive
+    def get_queue_archive_after(self) -> int:
+        #? Finished tasks kept as cards, older ones are archived out of the list
+        return int(self._get("queue_archive_after"))
+    
+    def set_queue_archive_after(self, count: int):
+        #! Update finished task limit (at least 0) and save
+        self._set("queue_archive_after", max(0, int(count)))
+    
+    # HTTP Connections Per Host
+    def get_http_connections_per_host(self) -> int:
+        #? Pooled connections the transcript client may keep open to the API host
+        return int(self._get("http_connections_per_host"))
+    
+    def set_http_connections_per_host(self, count: int):
+        #! Update per-host connection limit (at least 1) and save
+        self._set("http_connections_per_host", max(1, int(count)))
+    
+    # Transcript Cache
+    def get_transcript_cache_enabled(self) -> bool:
+        #? Whether fetched transcripts are read from / written to the local cache
+        return bool(self._get("transcript_cache_enabled"))
+    
+    def set_transcript_cache_enabled(self, enabled: bool):
+        #! Toggle the transcript cache and save
+        self._set("transcript_cache_enabled", enabled)
+    
+    def get_transcript_cache_ttl_days(self) -> float:
+        #? Days a cached transcript stays valid
+        return float(self._get("transcript_cache_ttl_days"))
+    
+    def get_transcript_cache_max_mb(self) -> float:
+        #? Maximum size of the cache folder in megabytes
+        return float(self._get("transcript_cache_max_mb"))
+    
+    # PDF Workers
+    def get_pdf_workers(self) -> int:
+        #? Worker processes used for PDF rendering (0 renders in a background thread)
+        return int(self._get("pdf_workers"))
+    
+    def set_pdf_workers(self, count: int):
+        #! Update PDF worker process count and save
+        self._set("pdf_workers", max(0, int(count)))
+    
+    # PDF Layout
+    def get_pdf_timestamps(self) -> bool:
+        #? Whether paragraphs get a timestamp heading in the PDF
+        return bool(self._get("pdf_timestamps"))
+    
+    def set_pdf_timestamps(self, enabled: bool):
+        #! Toggle timestamp headings and save
+        self._set("pdf_timestamps", enabled)
+    
+    def get_pdf_paragraph_seconds(self) -> float:
+        #? Approximate seconds of speech collected into one paragraph
+        return float(self._get("pdf_paragraph_seconds"))
+    
+    def get_pdf_engine(self) -> str:
+        #? PDF renderer: "platypus" (full layout) or "canvas" (fast, plain text)
+        return self._get("pdf_engine")
+    
+    def set_pdf_engine(self, engine: str):
+        #! Update PDF renderer and save
+        self._set("pdf_engine", engine)
+    
+    def get_pdf_digest(self) -> bool:
+        #? Whether the queue is rendered into one combined PDF instead of one per video
+        return bool(self._get("pdf_digest"))
+    
+    def set_pdf_digest(self, enabled: bool):
+        #! Toggle combined digest mode and save
+        self._set("pdf_digest", enabled)
+    
+    def get_pdf_dedupe_captions(self) -> bool:
+        #? Whether text repeated by rolling auto-captions is removed
+        return bool(self._get("pdf_dedupe_captions"))
+    
+    def set_pdf_dedupe_captions(self, enabled: bool):
+        #! Toggle caption de-duplication and save
+        self._set("pdf_dedupe_captions", enabled)
+    
+    def get_pdf_rebuild_sentences(self) -> bool:
+        #? Whether caption text is regrouped into whole sentences
+        return bool(self._get("pdf_rebuild_sentences"))
+    
+    def set_pdf_rebuild_sentences(self, enabled: bool):
+        #! Toggle sentence rebuilding and save
+        self._set("pdf_rebuild_sentences", enabled)
+    
+    # PDF Output
+    def get_pdf_skip_unchanged(self) -> bool:
+        #? Whether a PDF already rendered from the same transcript and options is kept instead of re-rendered
+        return bool(self._get("pdf_skip_unchanged"))
+    
+    def set_pdf_skip_unchanged(self, enabled: bool):
+        #! Toggle unchanged output skipping and save
+        self._set("pdf_skip_unchanged", enabled)
+    
+    # Search Index
+    def get_search_index_enabled(self) -> bool:
+        #? Whether fetched transcripts are added to the local full-text search index
+        return bool(self._get("search_index_enabled"))
+    
+    def set_search_index_enabled(self, enabled: bool):
+        #! Toggle transcript indexing and save
+        self._set("search_index_enabled", enabled)
+    
+    # API Rate Limit And Retries
+    def get_api_requests_per_second(self) -> float:
+        #? Average transcript API requests per second (0 disables limiting)
+        return float(self._get("api_requests_per_second"))
+    
+    def get_api_max_retries(self) -> int:
+        #? Extra attempts for throttled or failed API requests
+        return int(self._get("api_max_retries"))
+    
+    # Metrics
+    def get_metrics_enabled(self) -> bool:
+        #? Whether per-task stage timings are appended to the metrics file
+        return bool(self._get("metrics_enabled"))
+    
+    def get_metrics_profile(self) -> bool:
+        #? Whether each render is profiled with cProfile
+        return bool(self._get("metrics_profile"))
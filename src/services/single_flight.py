@@ -0,0 +1,40 @@
+import asyncio
+
+
+class SingleFlight:
+    """
+    #! Coalesces concurrent calls with the same key into one in-flight call
+    #? Callers that arrive while a call is running await its result instead of
+    #? starting their own. The shared call is only cancelled once every caller
+    #? waiting on it has been cancelled.
+    """
+
+    def __init__(self):
+        self._inflight = {}  #? key -> [task, number of waiting callers]
+
+    def is_running(self, key) -> bool:
+        return key in self._inflight
+
+    async def do(self, key, func):
+        #! Runs `func()` once per key at a time and returns its result to every caller
+        entry = self._inflight.get(key)
+        if entry is None:
+            entry = [asyncio.ensure_future(func()), 0]
+            self._inflight[key] = entry
+            entry[0].add_done_callback(lambda task: self._forget(key, task))
+        entry[1] += 1
+        try:
+            return await asyncio.shield(entry[0])
+        except asyncio.CancelledError:
+            entry[1] -= 1
+            if entry[1] == 0 and not entry[0].done():  #? Nobody is waiting anymore
+                entry[0].cancel()
+                #? Cancelling takes effect later - a caller arriving meanwhile starts a fresh call instead of joining this one
+                self._forget(key, entry[0])
+            raise
+
+    def _forget(self, key, task):
+        #? A new call with the same key starts fresh once this one is finished
+        entry = self._inflight.get(key)
+        if entry is not None and entry[0] is task:
+            del self._inflight[key]
@@ -0,0 +1,192 @@
+import collections
+import heapq
+import itertools
+import uuid
+
+#? Task states while the task is in the queue list
+WAITING = "waiting"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+REMOVED = "removed"  #? Cancelled by the user, dropped from the list
+
+#? Task priorities, higher runs first
+PRIORITY_HIGH = 1
+PRIORITY_NORMAL = 0
+PRIORITY_LOW = -1
+
+#? Finished task moved out of the list, kept as a small tuple
+ArchivedTask = collections.namedtuple("ArchivedTask", "task_id video_id state detail")
+
+
+class TaskRecord:
+    #! State of one queue task, independent of whether its card is built
+    __slots__ = ("task_id", "video_id", "priority", "rank", "size_hint", "heap_version", "state",
+                 "progress", "status", "handle")
+
+    def __init__(self, task_id: str, video_id: str):
+        self.task_id = task_id  #? Stable ID used in the queue journal
+        self.video_id = video_id
+        self.priority = PRIORITY_NORMAL
+        self.rank = 0.0  #? Position in the queue list, smaller runs first within a priority
+        self.size_hint = None  #? Cached transcript size (shortest-first ordering)
+        self.heap_version = 0
+        self.state = WAITING
+        self.progress = None  #? 0..1 once the task started, None hides the progress bar
+        self.status = ""  #? Status line, the error message of a failed task
+        self.handle = None  #? Asyncio task running the conversion
+
+
+class TaskQueue:
+    """
+    #! Queue model - task list, execution order and archive, no UI (not thread-safe, callers lock)
+    #? `tasks` is the display order (top first). Execution order comes from a heap keyed by
+    #? (priority, transcript size when shortest-first is on, list rank), stale heap entries
+    #? are skipped when popped. Once more than `archive_after` finished tasks are in the list
+    #? the oldest ones are moved to `archive` as ArchivedTask tuples.
+    """
+
+    def __init__(self, size_hint=None, shortest_first: bool = False, archive_after: int = 50,
+                 archive_max: int = 10000):
+        self.size_hint = size_hint  #? video_id -> cached transcript size or None
+        self.shortest_first = shortest_first
+        self.archive_after = archive_after  #? Finished tasks kept in the list
+        self.tasks = []
+        self.archive = collections.deque(maxlen=archive_max)  #? Most recent archived tasks
+        self.archived = collections.Counter()  #? Archived task count per final state
+        self._active = {}  #? video_id -> waiting or running record
+        self._finished = collections.deque()  #? Finished records still in the list, oldest first
+        self._waiting = []  #? Heap of (key, seq, version, record)
+        self._seq = itertools.count()
+        self._top_rank = 0.0  #? Rank of the topmost task, new tasks go above it
+        self._known_size = [0, 0]  #? Sum and count of known transcript sizes (estimate for unknown ones)
+
+    def __len__(self) -> int:
+        return len(self.tasks)
+
+    def add(self, video_ids: list, task_ids: list | None = None) -> tuple:
+        #! Adds videos on top of the list, returns (new records, (task_id, video_id) of skipped restored duplicates)
+        #? A video that is already waiting or running is skipped
+        added, duplicates = [], []
+        for index, video_id in enumerate(video_ids):
+            if video_id in self._active:
+                if task_ids:
+                    duplicates.append((task_ids[index], video_id))
+                continue
+            record = TaskRecord(task_ids[index] if task_ids else uuid.uuid4().hex, video_id)
+            self._active[video_id] = record
+            added.append(record)
+        self.tasks[0:0] = reversed(added)  #? Same order as adding them one by one
+        for record in added:
+            self._enqueue(record)
+        return added, duplicates
+
+    def find_active(self, video_id: str) -> TaskRecord | None:
+        return self._active.get(video_id)
+
+    def index(self, record: TaskRecord) -> int:
+        return self.tasks.index(record)
+
+    def _track_size(self, video_id: str) -> int | None:
+        size = self.size_hint(video_id) if self.size_hint else None
+        if size is not None:
+            self._known_size[0] += size
+            self._known_size[1] += 1
+        return size
+
+    def _key(self, record: TaskRecord) -> tuple:
+        size = 0
+        if self.shortest_first:
+            total, count = self._known_size
+            size = record.size_hint if record.size_hint is not None else (total / count if count else 0)  #? Unknown = average
+        return (-record.priority, size, record.rank)
+
+    def _enqueue(self, record: TaskRecord, new: bool = True):
+        #! Pushes a waiting task onto the heap (again, after its priority or rank changed)
+        if new:
+            self._top_rank -= 1
+            record.rank = self._top_rank
+            record.size_hint = self._track_size(record.video_id) if self.shortest_first else None
+        record.heap_version += 1  #? Older heap entries of this task become stale
+        heapq.heappush(self._waiting, (self._key(record), next(self._seq), record.heap_version, record))
+
+    def set_shortest_first(self, enabled: bool):
+        #? Re-keys every waiting task when the ordering policy changes
+        if enabled == self.shortest_first:
+            return
+        self.shortest_first = enabled
+        self._known_size = [0, 0]
+        waiting = [record for record in self._active.values() if record.state == WAITING]
+        for record in waiting:
+            record.size_hint = self._track_size(record.video_id) if enabled else None
+        self._waiting = []
+        for record in waiting:
+            self._enqueue(record, new=False)
+
+    def set_priority(self, record: TaskRecord, priority: int):
+        #! Changes a task's priority, a waiting task is re-keyed
+        record.priority = priority
+        if record.state == WAITING:
+            self._enqueue(record, new=False)
+
+    def move(self, record: TaskRecord, index: int):
+        #! Moves a task in the list and gives it a rank between its new neighbours
+        self.tasks.remove(record)
+        self.tasks.insert(index, record)
+        above = self.tasks[index - 1].rank if index > 0 else None
+        below = self.tasks[index + 1].rank if index + 1 < len(self.tasks) else None
+        if above is None and below is None:
+            record.rank = 0.0
+        elif above is None:
+            record.rank = below - 1
+            self._top_rank = min(self._top_rank, record.rank)
+        elif below is None:
+            record.rank = above + 1
+        else:
+            record.rank = (above + below) / 2
+        if record.state == WAITING:
+            self._enqueue(record, new=False)
+
+    def pop_next(self) -> TaskRecord | None:
+        #! Next waiting task in execution order, marked as running
+        while self._waiting:
+            _, _, version, record = heapq.heappop(self._waiting)
+            if version == record.heap_version and record.state == WAITING:
+                record.state = RUNNING
+                return record
+        return None
+
+    def waiting(self) -> list:
+        #? Waiting tasks, oldest first
+        return [record for record in reversed(self.tasks) if record.state == WAITING]
+
+    def remove(self, record: TaskRecord):
+        #! Drops a task from the list (its heap entry is skipped when popped)
+        if record.state == REMOVED:
+            return  #? Already removed or archived
+        self.tasks.remove(record)
+        if self._active.get(record.video_id) is record:
+            del self._active[record.video_id]
+        record.state = REMOVED
+        record.heap_version += 1
+
+    def finish(self, record: TaskRecord, state: str) -> int:
+        #! Marks a task done or failed, returns how many finished tasks were archived
+        if record.state == REMOVED:
+            return 0
+        record.state = state
+        if self._active.get(record.video_id) is record:
+            del self._active[record.video_id]
+        self._finished.append(record)
+
+        archived = 0
+        while len(self._finished) > self.archive_after:
+            oldest = self._finished.popleft()
+            if oldest.state == REMOVED:
+                continue  #? Cancelled after it finished, already gone
+            self.tasks.remove(oldest)
+            self.archive.append(ArchivedTask(oldest.task_id, oldest.video_id, oldest.state, oldest.status))
+            self.archived[oldest.state] += 1
+            oldest.state = REMOVED
+            archived += 1
+        return archived
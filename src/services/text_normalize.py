@@ -0,0 +1,95 @@
+from xml.sax.saxutils import escape as xml_escape
+from services.transcript_stream import Transcript
+
+#? Characters that close a sentence, used to pick paragraph boundaries
+SENTENCE_END = ('.', '!', '?', '…', '."', '?"', '!"')
+
+#? Last emitted words a new caption is compared against (rolling auto-captions repeat the tail)
+OVERLAP_WINDOW = 32
+
+#? Shortest repeated run that counts as a duplicate - single words repeat in normal speech
+MIN_OVERLAP = 2
+
+#? Sentence mode cuts a segment here even if no sentence has ended yet
+MAX_PENDING_WORDS = 80
+
+#? Stripped before comparing words, so "going," and "going" match
+_PUNCTUATION = ".,!?;:…\"'()[]-"
+
+
+def _overlap(recent: list, keys: list) -> int:
+    #? Longest run of `keys` that starts the caption and ends the already emitted text
+    for size in range(min(len(recent), len(keys)), MIN_OVERLAP - 1, -1):
+        if recent[-size:] == keys[:size]:
+            return size
+    return 0
+
+
+def normalize_segments(transcript, escape: bool = False, dedupe: bool = True, sentences: bool = False):
+    """
+    #! Single pass over transcript entries, yields (text, start, consumed) per output segment
+    #? Whitespace and newlines collapse to single spaces and empty captions are dropped.
+    #? dedupe removes words a caption repeats from the end of the previous ones, but only when
+    #? the caption starts before the previous one ends - rolling auto-captions overlap in time,
+    #? speech that really repeats itself does not. sentences regroups the words so every segment ends
+    #? at a sentence end and capitalizes sentence starts. escape XML-escapes the text for
+    #? platypus Paragraphs. `consumed` counts the source entries read so far (progress).
+    """
+    recent = []  #? Comparison keys of the last OVERLAP_WINDOW emitted words
+    pending = []  #? Sentence mode: words waiting for their sentence to end
+    pending_start = None
+    sentence_start = True
+    consumed = 0
+    previous_end = None  #? End time of the previous caption, None when its timing is unknown
+
+    def emit(words: list) -> str:
+        nonlocal sentence_start
+        if sentences:
+            for index, word in enumerate(words):
+                if sentence_start and word[:1].islower():
+                    words[index] = word[0].upper() + word[1:]
+                sentence_start = word.endswith(SENTENCE_END)
+        text = " ".join(words)
+        return xml_escape(text) if escape else text
+
+    for entry in Transcript.from_entries(transcript):
+        consumed += 1
+        words = entry.text.split()
+        overlapping = previous_end is not None and entry.start is not None and entry.start < previous_end
+        if entry.start is not None and entry.duration is not None:
+            previous_end = entry.start + entry.duration
+        else:
+            previous_end = None
+        if dedupe and words:
+            keys = [word.strip(_PUNCTUATION).lower() for word in words]
+            skip = _overlap(recent, keys) if recent and overlapping else 0
+            if skip:
+                words = words[skip:]
+                keys = keys[skip:]
+            recent.extend(keys)
+            del recent[:-OVERLAP_WINDOW]
+        if not words:
+            continue
+
+        if not sentences:
+            yield emit(words), entry.start, consumed
+            continue
+
+        if not pending:
+            pending_start = entry.start
+        first_new = len(pending)
+        pending.extend(words)
+        cut = None
+        for index in range(len(pending) - 1, first_new - 1, -1):  #? Last sentence end in this caption
+            if pending[index].endswith(SENTENCE_END):
+                cut = index + 1
+                break
+        if cut is None and len(pending) >= MAX_PENDING_WORDS:
+            cut = len(pending)
+        if cut is not None:
+            yield emit(pending[:cut]), pending_start, consumed
+            del pending[:cut]
+            pending_start = entry.start  #? The rest of the caption starts the next segment
+
+    if pending:
+        yield emit(pending), pending_start, consumed
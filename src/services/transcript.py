@@ -1,31 +1,245 @@
+import asyncio
+import random
+import sqlite3
+import time
 import aiohttp
+from email.utils import parsedate_to_datetime
+from services.rate_limit import TokenBucket
+from services.single_flight import SingleFlight
+from services.transcript_stream import CHUNK_SIZE, TranscriptDecoder
 
-#! API endpoint for YouTube transcript service
+#! Default API endpoint for YouTube transcript service (api_url setting overrides it)
 URL = "https://transcriptapi.com/api/v2/youtube/transcript"
 
+#? HTTP statuses worth another attempt (throttling, timeouts and server side errors)
+RETRYABLE_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+
+#? Readable reasons for the permanent API errors
+STATUS_MESSAGES = {
+    400: "Bad request",
+    401: "API key rejected",
+    402: "API credits exhausted",
+    403: "API key not allowed",
+    404: "Transcript not found",
+    429: "Rate limited by API",
+}
+
+
+class TranscriptError(Exception):
+    """
+    #! Transcript request failure
+    #? `retryable` tells whether trying again later may succeed,
+    #? `retry_after` carries the server's Retry-After delay in seconds if it sent one
+    """
+
+    def __init__(self, message: str, retryable: bool = False, status: int | None = None, retry_after: float | None = None):
+        super().__init__(message)
+        self.retryable = retryable
+        self.status = status
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    #? Retry-After is either a number of seconds or an HTTP date
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class TranscriptClient:
+    """
+    #! Long-lived transcript API client
+    #? Owns one pooled aiohttp session, so TCP connections, DNS lookups and
+    #? TLS sessions are reused between videos instead of being opened per call
+    """
+
+    def __init__(self, limit: int = 20, limit_per_host: int = 8, keepalive_timeout: float = 30.0,
+                 dns_cache_ttl: int = 300, timeout: float = 30.0, cache=None, requests_per_second: float = 2.0,
+                 max_retries: int = 4, backoff_base: float = 1.0, backoff_max: float = 60.0, url: str | None = None,
+                 index=None):
+        self.url = url or URL  #? Transcript endpoint (a local stub server for load tests)
+        self.limit = limit  #? Max open connections in total
+        self.limit_per_host = limit_per_host  #? Max open connections to the API host
+        self.keepalive_timeout = keepalive_timeout  #? Seconds an idle connection is kept open
+        self.dns_cache_ttl = dns_cache_ttl  #? Seconds a resolved address is reused
+        self.timeout = timeout  #? Total timeout of a single request
+        self.cache = cache  #? Optional TranscriptCache consulted before the network
+        self.index = index  #? Optional SearchIndex every returned transcript is added to
+        self.rate_limiter = TokenBucket(requests_per_second)  #? Shared by every request of this client
+        self.max_retries = max_retries  #? Extra attempts for retryable failures
+        self.backoff_base = backoff_base  #? First backoff step in seconds
+        self.backoff_max = backoff_max  #? Longest single wait, also caps Retry-After
+        self._flights = SingleFlight()  #? Concurrent requests for one video share a single fetch
+        self._session = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        #? Session is created lazily so it is bound to the running event loop
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                use_dns_cache=True,
+                ttl_dns_cache=self.dns_cache_ttl,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self._session
+
+    async def warm_up(self):
+        #? Opens the pooled session ahead of the first request (app startup)
+        self._get_session()
+
+    async def get_transcript(self, video_url: str, api, use_cache: bool = True, on_retry=None, metrics=None):
+        """
+        #! Fetch YouTube video transcript asynchronously
+        #? Served from the cache when possible, otherwise makes an authorized API
+        #? request over the pooled session and stores the result in the cache.
+        #? on_retry(attempt, delay, error) is called before each retry wait,
+        #? an optional TaskMetrics receives cache/API latency and size figures.
+        #? With a search index the transcript is indexed before it is returned.
+        """
+        if self.cache is not None and use_cache:
+            cached = await asyncio.to_thread(self.cache.get, video_url, "json")
+            if metrics is not None:
+                metrics.set("cache_hit", cached is not None)
+            if cached is not None:
+                await self._index(video_url, cached, metrics)  #? Covers transcripts cached before indexing existed
+                return cached
+
+        key = (video_url, "json")
+        if metrics is not None and self._flights.is_running(key):
+            metrics.set("coalesced_fetch", True)
+        transcript = await self._flights.do(key, lambda: self._fetch_and_store(video_url, api, use_cache, on_retry, metrics))
+        await self._index(video_url, transcript, metrics)
+        return transcript
+
+    async def _index(self, video_url: str, transcript, metrics=None):
+        #? Search indexing never fails a conversion, errors are only recorded in the metrics
+        if self.index is None:
+            return
+        started = time.perf_counter()
+        try:
+            added = await asyncio.to_thread(self.index.add, video_url, transcript)
+        except sqlite3.Error as e:
+            if metrics is not None:
+                metrics.set("index_error", str(e))
+            return
+        if metrics is not None and added:
+            metrics.set("index_seconds", round(time.perf_counter() - started, 4))
+
+    async def _fetch_and_store(self, video_url: str, api, use_cache: bool, on_retry, metrics):
+        #? Network fetch followed by a cache write, run once per in-flight video
+        transcript = await self._fetch_with_retry(video_url, api, on_retry, metrics)
+
+        if self.cache is not None and use_cache:
+            await asyncio.to_thread(self.cache.put, video_url, transcript, "json")
+        return transcript
+
+    def _backoff(self, attempt: int) -> float:
+        #? Exponential backoff with full jitter
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    async def _fetch_with_retry(self, video_url: str, api, on_retry=None, metrics=None):
+        #! Rate limited request, retried with backoff while the error is retryable
+        attempt = 0
+        while True:
+            await self.rate_limiter.acquire()
+            try:
+                transcript = await self._fetch(video_url, api, metrics)
+                if metrics is not None:
+                    metrics.set("api_attempts", attempt + 1)
+                return transcript
+            except TranscriptError as e:
+                if metrics is not None:
+                    metrics.set("api_attempts", attempt + 1)
+                if not e.retryable or attempt >= self.max_retries:
+                    raise
+                if e.retry_after is not None:
+                    delay = min(e.retry_after, self.backoff_max)
+                    self.rate_limiter.pause(delay)  #? Every task waits, not just this one
+                else:
+                    delay = self._backoff(attempt)
+                attempt += 1
+                if on_retry:
+                    on_retry(attempt, delay, e)
+                await asyncio.sleep(delay)
+
+    async def _fetch(self, video_url: str, api, metrics=None):
+        #? Prepare request parameters
+        params = {
+            "video_url": video_url,
+            "format": "json",
+        }
+
+        #! Set authorization header with API key
+        headers = {
+            "Authorization": f"Bearer {api}",
+        }
+
+        started = time.perf_counter()
+        try:
+            #! Send GET request to transcript API
+            async with self._get_session().get(self.url, params=params, headers=headers) as resp:
+                #? Failed requests are classified as retryable or permanent
+                if resp.status >= 400:
+                    raise TranscriptError(
+                        f"{STATUS_MESSAGES.get(resp.status, resp.reason or 'HTTP error')} (HTTP {resp.status})",
+                        retryable=resp.status in RETRYABLE_STATUSES,
+                        status=resp.status,
+                        retry_after=parse_retry_after(resp.headers.get("Retry-After")),
+                    )
+                #! Body is decoded while it arrives, entries go straight into compact arrays
+                decoder = TranscriptDecoder()
+                try:
+                    async for chunk in resp.content.iter_chunked(CHUNK_SIZE):
+                        decoder.feed(chunk)
+                    transcript = decoder.close()
+                except ValueError as e:
+                    raise TranscriptError("Invalid response from API") from e
+        except (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, asyncio.TimeoutError) as e:
+            raise TranscriptError(f"Network error: {e or type(e).__name__}", retryable=True) from e
+
+        if metrics is not None:
+            metrics.set("api_seconds", round(time.perf_counter() - started, 4))
+            metrics.set("response_bytes", decoder.bytes_read)
+
+        #? Extract and return transcript data
+        if transcript is None:
+            raise TranscriptError("Response has no transcript")
+        return transcript
+
+    async def close(self):
+        #! Closes the pooled session, call once when the app shuts down
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+#? Shared client used by get_transcript()
+_default_client = None
+
+
+def get_client() -> TranscriptClient:
+    #? Returns the process-wide shared client, creating it on first use
+    global _default_client
+    if _default_client is None:
+        _default_client = TranscriptClient()
+    return _default_client
+
+
 async def get_transcript(video_url: str, api):
     """
     #! Fetch YouTube video transcript asynchronously
-    #? Makes authorized API request and returns transcript data
+    #? Kept for existing callers, uses the shared pooled client
     """
-    #? Prepare request parameters
-    params = {
-        "video_url": video_url,
-        "format": "json",
-    }
-    
-    #! Set authorization header with API key
-    headers = {
-        "Authorization": f"Bearer {api}",
-    }
-    
-    #? Create async HTTP session
-    async with aiohttp.ClientSession() as session:
-        #! Send GET request to transcript API
-        async with session.get(URL, params=params, headers=headers, timeout=30) as resp: # type: ignore
-            #? Raise exception if request fails
-            resp.raise_for_status()
-            #! Parse JSON response
-            data = await resp.json()
-            #? Extract and return transcript data
-            return data["transcript"]
\ No newline at end of file
+    return await get_client().get_transcript(video_url, api)
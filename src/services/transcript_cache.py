@@ -0,0 +1,136 @@
+import gzip
+import json
+import os
+import re
+import threading
+import time
+from services.transcript_stream import CHUNK_SIZE, TranscriptDecoder, iter_json_entries
+
+
+class TranscriptCache:
+    """
+    #! Persistent on-disk transcript cache
+    #? Stores one gzip-compressed JSON file per (video ID, format) pair.
+    #? Entries are streamed in and out, so a long transcript is never held twice.
+    #? Entries expire after `ttl` seconds and the least recently used files are
+    #? evicted once the folder grows past `max_bytes`.
+    """
+
+    def __init__(self, cache_dir: str, ttl: float = 30 * 24 * 3600, max_bytes: int = 200 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.ttl = ttl  #? Seconds an entry stays valid, 0 disables expiry
+        self.max_bytes = max_bytes  #? Total size limit of the cache folder
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._index = None  #? path -> (size, last use time), built on first write
+        self._lock = threading.Lock()  #? Cache is used from worker threads
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, video_id: str, fmt: str) -> str:
+        #? Keeps file names safe even if a raw URL is used as key
+        key = re.sub(r'[^a-zA-Z0-9_-]', '_', f"{video_id}.{fmt}")
+        return os.path.join(self.cache_dir, f"{key}.json.gz")
+
+    def size_hint(self, video_id: str, fmt: str = "json") -> int | None:
+        #? Compressed size of a cached transcript without reading it, None when not cached
+        try:
+            return os.path.getsize(self._path(video_id, fmt))
+        except OSError:
+            return None
+
+    def get(self, video_id: str, fmt: str = "json"):
+        #! Returns the cached Transcript or None on miss / expiry
+        path = self._path(video_id, fmt)
+        decoder = TranscriptDecoder()
+        try:
+            with gzip.open(path, 'rb') as f:
+                while chunk := f.read(CHUNK_SIZE):
+                    decoder.feed(chunk)
+            transcript = decoder.close()
+        except (OSError, ValueError, EOFError):
+            #? Missing or unreadable entry counts as a miss
+            with self._lock:
+                self.misses += 1
+            return None
+
+        if transcript is None or (self.ttl and time.time() - decoder.fields.get("created", 0) > self.ttl):
+            self._remove(path)
+            with self._lock:
+                self.misses += 1
+            return None
+
+        #? Touch the file so LRU eviction sees it as recently used
+        now = time.time()
+        try:
+            os.utime(path, (now, now))
+        except OSError:
+            pass
+        with self._lock:
+            self.hits += 1
+            if self._index is not None and path in self._index:
+                self._index[path] = (self._index[path][0], now)
+        return transcript
+
+    def put(self, video_id: str, transcript, fmt: str = "json"):
+        #! Stores a transcript atomically and evicts old entries if needed
+        path = self._path(video_id, fmt)
+        header = {"video_id": video_id, "format": fmt, "created": time.time()}
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            #? Same document as json.dump of the payload, written entry by entry
+            f.write(json.dumps(header, ensure_ascii=False, separators=(',', ':'))[:-1] + ',"transcript":')
+            for part in iter_json_entries(transcript):
+                f.write(part)
+            f.write("}")
+        os.replace(tmp_path, path)  #? Readers never see a half written file
+
+        with self._lock:
+            index = self._load_index()
+            index[path] = (os.path.getsize(path), time.time())
+            self._evict(index)
+
+    def _load_index(self) -> dict:
+        #? Scans the cache folder once, later writes keep the index up to date
+        if self._index is None:
+            self._index = {}
+            for name in os.listdir(self.cache_dir):
+                if name.endswith(".json.gz"):
+                    path = os.path.join(self.cache_dir, name)
+                    try:
+                        st = os.stat(path)
+                    except OSError:
+                        continue
+                    self._index[path] = (st.st_size, st.st_mtime)
+        return self._index
+
+    def _evict(self, index: dict):
+        #! Drops least recently used entries until the cache fits in max_bytes
+        total = sum(size for size, _ in index.values())
+        if total <= self.max_bytes:
+            return
+        for path, (size, _) in sorted(index.items(), key=lambda item: item[1][1]):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            del index[path]
+            total -= size
+            self.evictions += 1
+
+    def _remove(self, path: str):
+        #? Deletes a single entry (expired or invalid)
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        with self._lock:
+            if self._index is not None:
+                self._index.pop(path, None)
+
+    def stats(self) -> dict:
+        #? Hit/miss counters for diagnostics
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions}
@@ -0,0 +1,199 @@
+import codecs
+import json
+import math
+from array import array
+
+#? Bytes read from the response (or cache file) per step
+CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = " \t\r\n"
+
+
+class Segment:
+    """
+    #! One transcript entry
+    #? Built on the fly while iterating a Transcript, never stored.
+    """
+
+    __slots__ = ("text", "start", "duration")
+
+    def __init__(self, text: str, start: float | None = None, duration: float | None = None):
+        self.text = text
+        self.start = start
+        self.duration = duration
+
+
+class Transcript:
+    """
+    #! Compact transcript storage as parallel arrays
+    #? Texts are kept in a list, timings in float arrays (NaN = missing), so a
+    #? 10 hour transcript costs a fraction of the equivalent list of dicts and
+    #? pickles cheaply into the PDF worker processes.
+    """
+
+    __slots__ = ("texts", "starts", "durations")
+
+    def __init__(self):
+        self.texts = []
+        self.starts = array('d')
+        self.durations = array('d')
+
+    @classmethod
+    def from_entries(cls, entries) -> "Transcript":
+        #? Converts TranscriptAPI style dicts ({"text", "start", "duration"})
+        if isinstance(entries, cls):
+            return entries
+        transcript = cls()
+        for entry in entries:
+            transcript.append(entry.get("text", ""), entry.get("start"), entry.get("duration"))
+        return transcript
+
+    def append(self, text, start=None, duration=None):
+        self.texts.append(text if isinstance(text, str) else str(text or ""))
+        self.starts.append(_to_float(start))
+        self.durations.append(_to_float(duration))
+
+    def __len__(self):
+        return len(self.texts)
+
+    def __iter__(self):
+        for text, start, duration in zip(self.texts, self.starts, self.durations):
+            yield Segment(text, None if math.isnan(start) else start, None if math.isnan(duration) else duration)
+
+    def to_entries(self):
+        #? Yields the entries as TranscriptAPI style dicts, one at a time
+        for segment in self:
+            entry = {"text": segment.text}
+            if segment.start is not None:
+                entry["start"] = segment.start
+            if segment.duration is not None:
+                entry["duration"] = segment.duration
+            yield entry
+
+
+def _to_float(value) -> float:
+    try:
+        return float(value) if value is not None else math.nan
+    except (TypeError, ValueError):
+        return math.nan
+
+
+class TranscriptDecoder:
+    """
+    #! Incremental decoder for {"...": ..., "transcript": [{...}, ...]} documents
+    #? Bytes are fed in chunks and each transcript entry is decoded as soon as it
+    #? is complete, so only the unparsed tail of the document is held in memory.
+    #? Other top-level keys are kept in `fields` (they are small: ids, timestamps).
+    """
+
+    def __init__(self, key: str = "transcript"):
+        self.key = key
+        self.fields = {}
+        self.transcript = None  #? Stays None if the document has no `key` array
+        self.bytes_read = 0
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._json = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._state = "start"
+        self._current_key = None
+
+    def feed(self, chunk: bytes):
+        self.bytes_read += len(chunk)
+        self._buffer = self._buffer[self._pos:] + self._text.decode(chunk)
+        self._pos = 0
+        self._parse(final=False)
+
+    def close(self) -> Transcript:
+        #! Finishes decoding, raises ValueError for malformed or truncated input
+        self._buffer = self._buffer[self._pos:] + self._text.decode(b"", final=True)
+        self._pos = 0
+        self._parse(final=True)
+        if self._state != "end":
+            raise ValueError("Truncated JSON document")
+        return self.transcript
+
+    def _skip_whitespace(self) -> bool:
+        #? Moves past whitespace, False when the buffer is exhausted
+        while self._pos < len(self._buffer) and self._buffer[self._pos] in _WHITESPACE:
+            self._pos += 1
+        return self._pos < len(self._buffer)
+
+    def _value(self, final: bool):
+        #? Decodes one complete JSON value, None while more input is needed
+        #? A value ending exactly at the buffer end may be a cut-off number, so it waits too
+        try:
+            value, end = self._json.raw_decode(self._buffer, self._pos)
+        except json.JSONDecodeError:
+            if final:
+                raise
+            return None
+        if end >= len(self._buffer) and not final:
+            return None
+        self._pos = end
+        return (value,)
+
+    def _expect(self, chars: str) -> str:
+        char = self._buffer[self._pos]
+        if char not in chars:
+            raise ValueError(f"Unexpected {char!r} at offset {self.bytes_read - len(self._buffer) + self._pos}")
+        self._pos += 1
+        return char
+
+    def _parse(self, final: bool):
+        while self._state != "end" and self._skip_whitespace():
+            state = self._state
+            if state == "start":
+                self._expect("{")
+                self._state = "first_key"
+            elif state in ("first_key", "key"):
+                if state == "first_key" and self._buffer[self._pos] == "}":
+                    self._pos += 1
+                    self._state = "end"
+                    continue
+                decoded = self._value(final)
+                if decoded is None:
+                    return
+                if not isinstance(decoded[0], str):
+                    raise ValueError("Object key must be a string")
+                self._current_key = decoded[0]
+                self._state = "colon"
+            elif state == "colon":
+                self._expect(":")
+                self._state = "value"
+            elif state == "value":
+                if self._current_key == self.key and self._buffer[self._pos] == "[":
+                    self._pos += 1
+                    self.transcript = Transcript()
+                    self._state = "first_item"
+                    continue
+                decoded = self._value(final)
+                if decoded is None:
+                    return
+                self.fields[self._current_key] = decoded[0]
+                self._state = "next_key"
+            elif state == "next_key":
+                self._state = "key" if self._expect(",}") == "," else "end"
+            elif state in ("first_item", "item"):
+                if state == "first_item" and self._buffer[self._pos] == "]":
+                    self._pos += 1
+                    self._state = "next_key"
+                    continue
+                decoded = self._value(final)
+                if decoded is None:
+                    return
+                entry = decoded[0]
+                if isinstance(entry, dict):
+                    self.transcript.append(entry.get("text", ""), entry.get("start"), entry.get("duration"))
+                self._state = "next_item"
+            elif state == "next_item":
+                self._state = "item" if self._expect(",]") == "," else "next_key"
+
+
+def iter_json_entries(transcript):
+    #? Serializes a transcript entry by entry, for writers that stream to disk
+    entries = transcript.to_entries() if isinstance(transcript, Transcript) else transcript
+    yield "["
+    for index, entry in enumerate(entries):
+        yield ("," if index else "") + json.dumps(entry, ensure_ascii=False, separators=(',', ':'))
+    yield "]"
@@ -0,0 +1,51 @@
+import re
+
+#? Different YouTube URL format patterns
+PATTERNS = [
+    r'(?:youtube\.com/watch\?v=|youtu\.be/)([a-zA-Z0-9_-]{11})(?:[&?]|$)',  #? watch?v= or youtu.be/
+    r'youtube\.com/embed/([a-zA-Z0-9_-]{11})',  #? embed/
+    r'youtube\.com/v/([a-zA-Z0-9_-]{11})',  #? /v/
+]
+
+#? All single-URL patterns as one precompiled alternation, one scan per URL
+_URL_PATTERN = re.compile("|".join(PATTERNS))
+
+#? Bulk text: every URL format in one pass, the ID must not run on into more ID characters -
+#? unless the next URL starts right after it (single-line paste fields drop the newlines)
+_ID = r'([a-zA-Z0-9_-]{11})(?:(?![a-zA-Z0-9_-])|(?=https?://|(?:www\.|m\.)?youtu))'
+_TEXT_PATTERN = re.compile(
+    r'(?:youtube\.com/watch\?(?:[^\s"\'<>]*?&)?v=|youtu\.be/|youtube\.com/(?:embed|v)/)' + _ID
+)
+
+#? Playlist exports (e.g. Google Takeout CSV) list bare IDs as whole cells
+_CSV_PATTERN = re.compile(_TEXT_PATTERN.pattern + r'|(?:^|,)[ \t"]*' + _ID + r'[ \t"]*(?=,|\r?$)', re.MULTILINE)
+
+#? Extensions accepted by the bulk import file dialog
+IMPORT_EXTENSIONS = ["txt", "csv"]
+
+
+def extract_youtube_id(url: str) -> str | None:
+    #! Extracts video ID from YouTube URL
+    match = _URL_PATTERN.search(url)
+    if match:
+        return next(group for group in match.groups() if group)
+
+    return None
+
+
+def extract_youtube_ids(text: str, bare_ids: bool = False) -> list:
+    #! Extracts every video ID from pasted text or an imported file, in order and without duplicates
+    #? bare_ids also accepts CSV cells that hold only an ID (playlist exports)
+    pattern = _CSV_PATTERN if bare_ids else _TEXT_PATTERN
+    ids = dict.fromkeys(
+        match.group(1) or match.group(2) if bare_ids else match.group(1)
+        for match in pattern.finditer(text)
+    )
+    return list(ids)
+
+
+def read_youtube_ids(path: str) -> list:
+    #! Reads an import file (.txt / .csv) and returns its video IDs
+    with open(path, 'r', encoding='utf-8-sig', errors='replace') as f:
+        text = f.read()
+    return extract_youtube_ids(text, bare_ids=path.lower().endswith(".csv"))
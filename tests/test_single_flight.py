@@ -0,0 +1,50 @@
+import asyncio
+from services.single_flight import SingleFlight
+
+
+def test_concurrent_calls_share_one_result():
+    async def scenario():
+        flights = SingleFlight()
+        calls = []
+
+        async def work():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "pdf"
+
+        results = await asyncio.gather(flights.do("key", work), flights.do("key", work))
+        return results, len(calls)
+
+    assert asyncio.run(scenario()) == (["pdf", "pdf"], 1)
+
+
+def test_request_right_after_cancel_starts_a_fresh_call():
+    #? The cancelled call is still winding down when the same key is requested again
+    async def scenario():
+        flights = SingleFlight()
+        started = asyncio.Event()
+
+        async def slow_to_cancel():
+            started.set()
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                await asyncio.sleep(0.01)  #? Clean-up before the cancellation completes
+                raise
+
+        async def work():
+            return "pdf"
+
+        first = asyncio.ensure_future(flights.do("key", slow_to_cancel))
+        await started.wait()
+        first.cancel()
+        await asyncio.sleep(0)  #? First caller handles its cancellation
+        assert not flights.is_running("key")
+        result = await flights.do("key", work)
+        try:
+            await first
+        except asyncio.CancelledError:
+            pass
+        return result
+
+    assert asyncio.run(scenario()) == "pdf"
@@ -0,0 +1,19 @@
+from services.task_queue import TaskQueue, DONE, REMOVED, PRIORITY_HIGH
+
+
+def test_pop_next_follows_priority_then_list_order():
+    #? New tasks go on top of the list, the topmost task of a priority runs first
+    queue = TaskQueue()
+    first, second, third = queue.add(["a", "b", "c"])[0]
+    queue.set_priority(first, PRIORITY_HIGH)
+    assert [queue.pop_next(), queue.pop_next(), queue.pop_next()] == [first, third, second]
+
+
+def test_remove_after_archive_is_a_no_op():
+    #? A card cancelled while its task is being archived must not fail
+    queue = TaskQueue(archive_after=0)
+    (record,), _ = queue.add(["a"])
+    queue.pop_next()
+    assert queue.finish(record, DONE) == 1
+    queue.remove(record)
+    assert record.state == REMOVED and queue.tasks == []
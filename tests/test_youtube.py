@@ -0,0 +1,29 @@
+from services.youtube import extract_youtube_id, extract_youtube_ids
+
+
+def test_extract_youtube_id_formats():
+    assert extract_youtube_id("https://www.youtube.com/watch?v=dQw4w9WgXcQ&t=10") == "dQw4w9WgXcQ"
+    assert extract_youtube_id("https://youtu.be/dQw4w9WgXcQ") == "dQw4w9WgXcQ"
+    assert extract_youtube_id("https://youtube.com/embed/dQw4w9WgXcQ") == "dQw4w9WgXcQ"
+    assert extract_youtube_id("https://example.com/watch?v=dQw4w9WgXcQ") is None
+
+
+def test_extract_youtube_ids_one_per_line():
+    text = "https://youtu.be/AAAAAAAAAAA\nhttps://www.youtube.com/watch?v=BBBBBBBBBBB\nhttps://youtu.be/AAAAAAAAAAA\n"
+    assert extract_youtube_ids(text) == ["AAAAAAAAAAA", "BBBBBBBBBBB"]
+
+
+def test_extract_youtube_ids_glued_urls():
+    #? Single-line paste fields drop the newlines between URLs
+    text = ("https://www.youtube.com/watch?v=AAAAAAAAAAAhttps://youtu.be/BBBBBBBBBBB"
+            "http://youtube.com/embed/CCCCCCCCCCCyoutu.be/DDDDDDDDDDDwww.youtube.com/watch?v=EEEEEEEEEEE")
+    assert extract_youtube_ids(text) == ["AAAAAAAAAAA", "BBBBBBBBBBB", "CCCCCCCCCCC", "DDDDDDDDDDD", "EEEEEEEEEEE"]
+
+
+def test_extract_youtube_ids_rejects_longer_ids():
+    assert extract_youtube_ids("https://youtu.be/AAAAAAAAAAAX") == []
+
+
+def test_extract_youtube_ids_bare_csv_cells():
+    text = "Video Id,Added\nAAAAAAAAAAA,2024-01-01\n\"BBBBBBBBBBB\",2024-01-02\n"
+    assert extract_youtube_ids(text, bare_ids=True) == ["AAAAAAAAAAA", "BBBBBBBBBBB"]